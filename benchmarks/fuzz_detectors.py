@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+# Fuzz/benchmark corpus of adversarial page texts for the text detectors of pdf_redactor.py
+# Every detector runs on every corpus page, the script fails if a detector takes longer than --max-seconds on a page.
+#
+#   python benchmarks/fuzz_detectors.py [--size 200000] [--seed 1] [--max-seconds 2]
+
+import argparse
+import base64
+import os
+import random
+import sys
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pdf_redactor
+
+
+# adversarial page texts of roughly the given size
+def build_corpus(size, seed):
+    rng = random.Random(seed)
+    blob = base64.b64encode(rng.randbytes(size)).decode()[:size]
+    return {
+        "base64 blob": blob,
+        "base64 lines": "\n".join(blob[i:i+76] for i in range(0, len(blob), 76)),
+        "at signs": "a@" * (size // 2),
+        "dotted at": ("x@" + "y." * 30 + " ") * (size // 64),
+        "table dump": "|".join(str(rng.randint(0, 99)) for _ in range(size // 3)),
+        "dotted numbers": ".".join(str(rng.randint(1, 31)) for _ in range(size // 3)),
+        "slashed numbers": "/".join(str(rng.randint(1, 12)) for _ in range(size // 3)),
+        "colon chains": ":".join(str(rng.randint(0, 59)).zfill(2) for _ in range(size // 3)),
+        "month names": " ".join(rng.choice(["10", "Aug", "Mär", "2023", ".", "-"]) for _ in range(size // 4)),
+        "upper case words": " ".join("".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(8)) for _ in range(size // 9)),
+        "iban like": " ".join("DE" + str(rng.randint(10, 99)) + " " + str(rng.randint(1000, 9999)) for _ in range(size // 10)),
+        "digits": "".join(rng.choice("0123456789 ") for _ in range(size)),
+        "mask repeats": "a" * size,
+    }
+
+
+def run_detectors(text, config):
+    budget = config.detection_budget
+    text_pages = [text]
+    # like run_redaction, only regex masks run on the guarded text
+    mask_pages = pdf_redactor.guard_text_pages(text_pages) if config.mask_regex else text_pages
+    return {
+        "phone": lambda: pdf_redactor.find_phone_numbers(text_pages, config, budget),
+        "email": lambda: pdf_redactor.find_email_addresses(text_pages, budget),
+        "mask": lambda: pdf_redactor.find_custom_mask(mask_pages, config.mask, config.mask_regex, budget),
+        "iban": lambda: pdf_redactor.find_ibans(text_pages, budget),
+        "bic": lambda: pdf_redactor.find_bics(text_pages, None, budget),
+        "timestamp": lambda: pdf_redactor.find_timestamp(text_pages, budget),
+        "date": lambda: pdf_redactor.find_date(text_pages, budget=budget),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='fuzz_detectors.py')
+    parser.add_argument('--size', type=int, default=200000, help='Approximate number of characters per corpus page. Default: 200000.')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed of the corpus. Default: 1.')
+    parser.add_argument('--max-seconds', type=float, default=2.0, help='Max time of a detector per page. Default: 2.')
+    args = parser.parse_args()
+
+    config = pdf_redactor.RedactorConfig(mask=["a" * 32, "aaa.aaa"])
+    corpus = build_corpus(args.size, args.seed)
+
+    failures = 0
+    print(f"{'corpus page':<20} {'detector':<10} {'seconds':>8}")
+    for name, text in corpus.items():
+        for detector, run in run_detectors(text, config).items():
+            start = time.perf_counter()
+            # the detectors are verbose, only the timings are of interest here
+            with redirect_stdout(StringIO()):
+                run()
+            elapsed = time.perf_counter() - start
+            flag = ""
+            if elapsed > args.max_seconds:
+                failures += 1
+                flag = "  <-- too slow"
+            print(f"{name:<20} {detector:<10} {elapsed:>8.3f}{flag}")
+
+    if failures:
+        print(f"\n[Error] {failures} detector run{'' if failures==1 else 's'} exceeded {args.max_seconds}s.")
+        sys.exit(1)
+    print("\n[i] All detectors stayed within budget.")
+
+
+if __name__ == "__main__":
+    main()
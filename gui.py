@@ -1,8 +1,9 @@
 
 import flet as ft
+import multiprocessing
 import os
 import threading
-from pdf_redactor import RedactorConfig, load_pdf, ocr_pdf, run_redaction, save_redactions_to_file, save_redactions_to_relative_file
+from pdf_redactor import RedactorConfig, PageCache, WorkerStartError, compile_policy, discover_pdfs, run_inline_batch, run_isolated_batch, unfinished_tasks, write_batch_profile
 
 class PDFRedactorGUI:
     def __init__(self, page: ft.Page):
@@ -72,6 +73,9 @@ class PDFRedactorGUI:
 
         # Preview & Process
         self.preview_toggle = ft.Switch(label="Preview before applying", value=False)
+        self.verify_toggle = ft.Switch(label="Verify redactions", value=False)
+        self.isolation_toggle = ft.Switch(label="Isolate files", value=True)
+        self.profile_toggle = ft.Switch(label="Write CPU profiles", value=False)
         self.process_button = ft.ElevatedButton(
             "Start Redaction", 
             icon=ft.Icons.PLAY_ARROW_ROUNDED, 
@@ -111,7 +115,7 @@ class PDFRedactorGUI:
                         content=ft.Column([
                             ft.Text("Settings", size=20, weight=ft.FontWeight.BOLD),
                             ft.Row([self.custom_mask, self.replacement_text], spacing=20),
-                            ft.Row([self.fill_color, self.preview_toggle], spacing=20),
+                            ft.Row([self.fill_color, self.preview_toggle, self.verify_toggle, self.isolation_toggle, self.profile_toggle], spacing=20),
                         ]),
                         padding=20
                     )
@@ -183,33 +187,58 @@ class PDFRedactorGUI:
                 text=self.replacement_text.value or None,
                 color=self.fill_color.value,
                 preview=self.preview_toggle.value,
+                verify=self.verify_toggle.value,
             )
+            # compile the redaction options once for all files
+            policy = compile_policy(config)
 
             files_to_process = []
             if self.selected_dir:
-                files_to_process = [os.path.join(self.selected_dir, f) for f in os.listdir(self.selected_dir) if f.lower().endswith(".pdf")]
+                files_to_process = discover_pdfs(self.selected_dir)
             else:
                 files_to_process = self.selected_files
 
             total = len(files_to_process)
-            for i, file_path in enumerate(files_to_process):
-                filename = os.path.basename(file_path)
-                self.status_text.value = f"Processing {i+1}/{total}: {filename}"
-                self.progress_bar.value = (i) / total
+            tasks = [(file_path, "{0}_{2}{1}".format(*os.path.splitext(file_path) + ("redacted",)), False) for file_path in files_to_process]
+            results = []
+
+            def on_result(result):
+                results.append(result)
+                self.status_text.value = f"Processed {len(results)}/{total}: {os.path.basename(result['input'])}"
+                self.progress_bar.value = len(results) / total
                 self.page.update()
 
-                # Core redaction logic
-                pdf_doc = load_pdf(file_path)
-                text_pages = ocr_pdf(pdf_doc)
-                pdf_doc = run_redaction(file_path, text_pages, pdf_doc, config)
-                
-                # Save
-                out_path = "{0}_{2}{1}".format(*os.path.splitext(file_path) + ("redacted",))
-                pdf_doc.ez_save(out_path)
-                pdf_doc.close()
-
-            self.status_text.value = f"Success! Processed {total} files."
-            self.status_text.color = ft.Colors.GREEN_400
+            # profiles are written next to the processed files
+            profile_dir = None
+            if self.profile_toggle.value and files_to_process:
+                profile_dir = os.path.join(self.selected_dir or os.path.dirname(files_to_process[0]), "pdf_redactor_profiles")
+
+            self.status_text.value = f"Processing {total} files..."
+            self.progress_bar.value = 0
+            self.page.update()
+
+            # every file runs in an isolated worker so a broken or hanging file does not stop the run,
+            # previews stay in this process, as do all files if no worker can be started
+            inline_tasks = tasks
+            if self.isolation_toggle.value and not policy.preview:
+                try:
+                    run_isolated_batch(tasks, policy, on_result=on_result, profile_dir=profile_dir)
+                    inline_tasks = []
+                except WorkerStartError:
+                    inline_tasks = unfinished_tasks(tasks, results)
+            if inline_tasks:
+                # detection results of repeated pages are shared across all files of the run
+                run_inline_batch(inline_tasks, policy, PageCache(), on_result, profile_dir)
+            if profile_dir:
+                write_batch_profile(profile_dir, files_to_process)
+
+            failed = [result for result in results if result["status"] != "ok"]
+            if failed:
+                self.status_text.value = f"Processed {total} files, {len(failed)} failed: " + ", ".join(os.path.basename(result["input"]) for result in failed)
+                self.status_text.color = ft.Colors.ORANGE_400
+            else:
+                self.status_text.value = f"Success! Processed {total} files."
+                self.status_text.color = ft.Colors.GREEN_400
             self.progress_bar.value = 1.0
             
         except Exception as e:
@@ -220,6 +249,8 @@ class PDFRedactorGUI:
         self.page.update()
 
 def main():
+    # workers are spawned from the packaged executable, which has to run them instead of the app
+    multiprocessing.freeze_support()
     ft.app(target=PDFRedactorGUI)
 
 if __name__ == "__main__":
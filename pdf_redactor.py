@@ -4,14 +4,42 @@ import pymupdf as fitz
 import phonenumbers
 import os
 import argparse
+import bisect
+import cProfile
+import csv
+import fnmatch
+import functools
+import hashlib
+import pstats
 import re
 import sys
+import threading
+import time
+import json
+import multiprocessing
+import multiprocessing.connection
+import shutil
+from collections import OrderedDict
 from tqdm import tqdm
-from PIL import Image
 import cv2
 import numpy as np
 from pyzbar.pyzbar import decode
 
+try:
+    import tomllib
+except ImportError:  # Python < 3.11, policy files have to be JSON
+    tomllib = None
+
+try:
+    import regex as regex_module
+except ImportError:  # regex masks run on re, which cannot be stopped, masks with nested quantifiers are rejected
+    regex_module = None
+
+try:
+    import resource
+except ImportError:  # Windows, memory limits of workers are not supported
+    resource = None
+
 class RedactorConfig:
     def __init__(self, **kwargs):
         self.email = kwargs.get('email', False)
@@ -33,6 +61,27 @@ class RedactorConfig:
         self.text_color_hex = kwargs.get('text_color_hex', None)
         self.output = kwargs.get('output', None)
         self.input = kwargs.get('input', None)
+        self.scan_only = kwargs.get('scan_only', False)
+        self.scan_report = kwargs.get('scan_report', None)
+        self.bic_registry = kwargs.get('bic_registry', None)
+        self.bic_strict = kwargs.get('bic_strict', False)
+        self.mask_regex = kwargs.get('mask_regex', False)
+        self.detection_budget = kwargs.get('detection_budget', None) or DETECTION_BUDGET
+        self.page_cache_size = kwargs.get('page_cache_size', PAGE_CACHE_SIZE)
+        self.recursive = kwargs.get('recursive', False)
+        self.include = kwargs.get('include', None)
+        self.exclude = kwargs.get('exclude', None)
+        self.journal = kwargs.get('journal', None)
+        self.resume = kwargs.get('resume', False)
+        self.workers = kwargs.get('workers', 1)
+        self.timeout = kwargs.get('timeout', FILE_TIMEOUT)
+        self.memory_limit = kwargs.get('memory_limit', None)
+        self.no_isolation = kwargs.get('no_isolation', False)
+        self.report = kwargs.get('report', None)
+        self.quarantine = kwargs.get('quarantine', None)
+        self.profile = kwargs.get('profile', None)
+        self.verify = kwargs.get('verify', False)
+        self.code_prefilter = kwargs.get('code_prefilter', True)
 
 
 
@@ -74,10 +123,12 @@ def save_redactions_to_file(pdf_document, filename):
     filepath = os.path.dirname(os.path.abspath(__file__))+"/"+filename
     print(f"\n[i] Saving changes to '{filepath}'")
     pdf_document.ez_save(filepath)
+    return filepath
 
 def save_redactions_to_relative_file(pdf_document, pathname):
     print(f"\n[i] Saving changes to '{pathname}'")
     pdf_document.ez_save(pathname)
+    return pathname
 
 # check if path is directory
 def is_directory(file_path):
@@ -106,16 +157,57 @@ def is_directory(file_path):
 def load_pdf(file_path):
     return fitz.open(file_path)
   
-# ocr pdf
-def ocr_pdf(pdf_document):
+# ocr pdf, with_words also returns the words of every page with their bounding boxes (for page_fingerprint)
+def ocr_pdf(pdf_document, with_words=False):
     text_pages = []
+    word_pages = []
     # for every page in pdf, get tex and append to list of text pages
     for page_num in range(len(pdf_document)):
         page = pdf_document.load_page(page_num)
-        text = page.get_text("text")
+        # the text and the words are extracted from the same text page
+        textpage = page.get_textpage()
+        text = page.get_text("text", textpage=textpage)
         text_pages.append(text)
-
-    return text_pages
+        if with_words:
+            word_pages.append(page.get_text("words", textpage=textpage))
+
+    return (text_pages, word_pages) if with_words else text_pages
+
+# max length of a run of non-whitespace characters that is passed to regex masks
+RUNAWAY_TOKEN_LENGTH = 512
+# time budget of a detector per page (in seconds)
+DETECTION_BUDGET = 10.0
+
+# blank out runs of non-whitespace longer than RUNAWAY_TOKEN_LENGTH (base64 blobs, table dumps) before user supplied
+# regexes, which may backtrack on them. The page text keeps its length, so all offsets stay valid.
+# The blanked spans are added to unscanned ({page_num: [(start, end)]}), if given.
+def guard_text_pages(text_pages, unscanned=None):
+    guarded_pages = []
+    for i, text in enumerate(text_pages):
+        runaway = [m.span() for m in re.finditer(r"\S+", text) if m.end() - m.start() > RUNAWAY_TOKEN_LENGTH]
+        if runaway:
+            print(f"[Warning] Regex masks skip {len(runaway)} runaway token{'' if len(runaway)==1 else 's'} (> {RUNAWAY_TOKEN_LENGTH} characters) on Page {i+1}")
+            if unscanned is not None:
+                unscanned.setdefault(i, []).extend(runaway)
+            parts = []
+            pos = 0
+            for start, end in runaway:
+                parts.append(text[pos:start])
+                parts.append(" " * (end - start))
+                pos = end
+            parts.append(text[pos:])
+            text = "".join(parts)
+        guarded_pages.append(text)
+    return guarded_pages
+
+# yield matches until the time budget of the page is used up, the page is flagged and the remaining matches skipped
+def within_budget(matches, budget, label, page_num):
+    deadline = time.perf_counter() + budget
+    for match in matches:
+        yield match
+        if time.perf_counter() > deadline:
+            print(f"[Warning] {label} detection exceeded its budget of {budget}s on Page {page_num+1}, skipping remaining matches.")
+            return
 
 def validate_output_flag(config):
     "Validates the output flag to ensure correct format"
@@ -144,8 +236,235 @@ def hex_to_rgb(hex: str):
     
     return tuple(int(hex[i:i+2], 16) / 255.0 for i in (0, 2, 4))
 
+
+### REDACTION POLICY
+
+# options of a RedactorConfig that make up the redaction policy, everything else (input, output, reports) belongs to the run
+POLICY_OPTIONS = (
+    "email", "link", "phonenumber", "geographic_code", "mask", "mask_regex", "date", "timestamp", "iban", "bic",
+    "bic_registry", "bic_strict", "barcode", "qrcode", "text", "color", "text_color", "color_hex", "text_color_hex", "preview",
+    "detection_budget", "verify", "code_prefilter",
+)
+
+class RedactionPolicy:
+    """
+    Compiled, immutable form of the redaction options of a RedactorConfig.
+    Colors are resolved, masks compiled and the BIC registry loaded once, so a policy can be reused for
+    every file of a batch and pickled cheaply to worker processes without being rebuilt.
+    """
+    __slots__ = POLICY_OPTIONS + ("fill_color", "text_fill_color", "mask_pattern", "bic_registry_codes")
+
+    def __init__(self, **options):
+        unknown = set(options) - set(POLICY_OPTIONS)
+        if unknown:
+            raise ValueError(f"Unknown policy option{'' if len(unknown)==1 else 's'}: {', '.join(sorted(unknown))}")
+
+        defaults = RedactorConfig()
+        values = {name: options.get(name, getattr(defaults, name)) for name in POLICY_OPTIONS}
+        # a single mask given as string is one mask, not one per character
+        values["mask"] = (values["mask"],) if isinstance(values["mask"], str) else tuple(values["mask"] or ())
+
+        if values["color"] not in COLOR_MAP or values["text_color"] not in COLOR_MAP:
+            raise ValueError(f"Invalid color, choose from: {', '.join(COLOR_MAP)}")
+        values["fill_color"] = hex_to_rgb(values["color_hex"]) if values["color_hex"] else COLOR_MAP[values["color"]]
+        values["text_fill_color"] = hex_to_rgb(values["text_color_hex"]) if values["text_color_hex"] else COLOR_MAP[values["text_color"]]
+        values["mask_pattern"] = compile_masks(values["mask"], values["mask_regex"]) if values["mask"] else None
+        values["bic_registry_codes"] = load_bic_registry(values["bic_registry"]) if values["bic_registry"] else None
+
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        # restore the compiled state as is instead of compiling the policy again
+        return _restore_policy, (tuple(getattr(self, name) for name in self.__slots__),)
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(**{name: getattr(config, name) for name in POLICY_OPTIONS})
+
+    @classmethod
+    def from_file(cls, file_path):
+        options = load_policy_file(file_path)
+        return cls(**{name: value for name, value in options.items() if name in POLICY_OPTIONS})
+
+def _restore_policy(state):
+    policy = object.__new__(RedactionPolicy)
+    for name, value in zip(RedactionPolicy.__slots__, state):
+        object.__setattr__(policy, name, value)
+    return policy
+
+# compile a RedactorConfig into a RedactionPolicy, policies are returned unchanged
+def compile_policy(config):
+    if isinstance(config, RedactionPolicy):
+        return config
+    return RedactionPolicy.from_config(config)
+
+# options that take a list of values, a single string in a policy file is a list of one
+LIST_OPTIONS = ("mask", "include", "exclude")
+
+# load RedactorConfig options from a TOML or JSON policy file
+def load_policy_file(file_path):
+    if file_path.lower().endswith(".toml"):
+        if tomllib is None:
+            raise ValueError("TOML policy files require Python 3.11 or newer, use a JSON policy file instead.")
+        with open(file_path, "rb") as f:
+            options = tomllib.load(f)
+    else:
+        with open(file_path, encoding="utf-8") as f:
+            options = json.load(f)
+
+    if not isinstance(options, dict):
+        raise ValueError(f"Policy file '{file_path}' must contain a table/object of options.")
+    # option names may also be written like their command line flags (text-color-hex)
+    options = {name.replace("-", "_"): value for name, value in options.items()}
+    unknown = set(options) - set(vars(RedactorConfig()))
+    if unknown:
+        raise ValueError(f"Unknown option{'' if len(unknown)==1 else 's'} in policy file '{file_path}': {', '.join(sorted(unknown))}")
+
+    for name in LIST_OPTIONS:
+        value = options.get(name)
+        if isinstance(value, str):
+            options[name] = [value]
+        elif value is not None and not (isinstance(value, list) and all(isinstance(item, str) for item in value)):
+            raise ValueError(f"Option '{name}' in policy file '{file_path}' must be a string or a list of strings.")
+    return options
+
+
+### REDACTION AREAS
+
+# size of a grid cell of the rectangle index (in PDF points)
+RECT_GRID_CELL = 64
+# max horizontal gap (in PDF points) between two rectangles on one text line that still counts as touching
+RECT_TOUCH_TOLERANCE = 1.0
+
+class PageRectIndex:
+    """
+    Grid based spatial index of the redaction rectangles of a single page.
+    Rectangles overlapping each other, or touching on the same text line, are merged on insert,
+    so that every redacted area gets exactly one redaction annotation.
+    """
+    def __init__(self, cell=RECT_GRID_CELL, tolerance=RECT_TOUCH_TOLERANCE):
+        self.cell = cell
+        self.tolerance = tolerance
+        self._rects = {}
+        self._grid = {}
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self._rects)
+
+    def _cells(self, r):
+        t = self.tolerance
+        for gx in range(int((r[0] - t) // self.cell), int((r[2] + t) // self.cell) + 1):
+            for gy in range(int((r[1] - t) // self.cell), int((r[3] + t) // self.cell) + 1):
+                yield gx, gy
+
+    def _candidates(self, r):
+        ids = set()
+        for cell in self._cells(r):
+            ids.update(self._grid.get(cell, ()))
+        return ids
+
+    def _mergeable(self, a, b):
+        # one rectangle contains the other
+        if (a[0] <= b[0] and a[1] <= b[1] and a[2] >= b[2] and a[3] >= b[3]) or \
+           (b[0] <= a[0] and b[1] <= a[1] and b[2] >= a[2] and b[3] >= a[3]):
+            return True
+        # same text line: vertical overlap of at least half the smaller height
+        overlap = min(a[3], b[3]) - max(a[1], b[1])
+        if overlap < 0.5 * min(a[3] - a[1], b[3] - b[1]):
+            return False
+        # overlapping or touching horizontally
+        return a[0] <= b[2] + self.tolerance and b[0] <= a[2] + self.tolerance
+
+    def _remove(self, rect_id):
+        r = self._rects.pop(rect_id)
+        for cell in self._cells(r):
+            self._grid[cell].discard(rect_id)
+
+    def add(self, rect):
+        r = tuple(rect)
+        # skip empty rectangles
+        if r[2] <= r[0] or r[3] <= r[1]:
+            return
+
+        # grow the rectangle until no indexed rectangle can be merged into it anymore
+        merged = True
+        while merged:
+            merged = False
+            for rect_id in self._candidates(r):
+                other = self._rects[rect_id]
+                if self._mergeable(r, other):
+                    self._remove(rect_id)
+                    r = (min(r[0], other[0]), min(r[1], other[1]), max(r[2], other[2]), max(r[3], other[3]))
+                    merged = True
+                    break
+
+        rect_id = self._next_id
+        self._next_id += 1
+        self._rects[rect_id] = r
+        for cell in self._cells(r):
+            self._grid.setdefault(cell, set()).add(rect_id)
+
+    def rects(self):
+        # merged rectangles in reading order
+        return [fitz.Rect(r) for r in sorted(self._rects.values(), key=lambda r: (r[1], r[0]))]
+
+
+# find all positions of the matches on a page, every distinct match is only searched once
+def search_page(page, matches):
+    rect_list = []
+    for match in dict.fromkeys(matches):
+        rect_list.extend(page.search_for(match))
+    return rect_list
+
+# add rects to the given rect index ({page_num: PageRectIndex}) or, without index, merge and redact them right away
+def redact_rects(page, rect_list, config, rect_index=None):
+    if rect_index is not None:
+        page_index = rect_index.setdefault(page.number, PageRectIndex())
+    else:
+        page_index = PageRectIndex()
+
+    for rect in rect_list:
+        page_index.add(rect)
+
+    if rect_index is None:
+        apply_page_rects(page, page_index.rects(), config)
+
+# add one redaction annotation per rect and apply them all at once
+def apply_page_rects(page, rect_list, config):
+    if not rect_list:
+        return
+
+    policy = compile_policy(config)
+    for rect in rect_list:
+        annots = page.add_redact_annot(quad=rect, text=policy.text, text_color=policy.text_fill_color, fill=policy.fill_color, cross_out=True)
+        if policy.preview:
+            preview_redactions(page, annots)
+
+    if not policy.preview:
+        # apply redactions to page
+        page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE)
+
+# redact all rects collected in the rect index
+def apply_rect_index(pdf_document, rect_index, config):
+    total = sum(len(page_index) for page_index in rect_index.values())
+    if total == 0:
+        return
+
+    print(f"\n[i] Applying {total} Redaction{'' if total==1 else 's'} on {len(rect_index)} Page{'' if len(rect_index)==1 else 's'}...\n")
+    for page_num in tqdm(sorted(rect_index), desc="[i] Redacting Pages", unit="page"):
+        page = pdf_document.load_page(page_num)
+        apply_page_rects(page, rect_index[page_num].rects(), config)
+
 ### PHONE NUMBERS
-def find_phone_numbers(text_pages, config):
+def find_phone_numbers(text_pages, config, budget=DETECTION_BUDGET):
     print("\n[i] Searching for Phone Numbers...")
     all_phone_numbers = {}
     # Determine the region code for phone number detection
@@ -153,7 +472,7 @@ def find_phone_numbers(text_pages, config):
     # for every text page in list of all pages, find all phone numbers and append to list of all phone numbers
     for i, text_page in enumerate(text_pages):
         page_phone_numbers = []
-        for match in phonenumbers.PhoneNumberMatcher(text_page, region_code):
+        for match in within_budget(phonenumbers.PhoneNumberMatcher(text_page, region_code), budget, "Phone Number", i):
             page_phone_numbers.append(match.raw_string)
         all_phone_numbers[i] = page_phone_numbers
         print(f" |  Found {len(page_phone_numbers)} Phone Number{'' if len(page_phone_numbers)==1 else 's'} on Page {i+1}: {', '.join(str(p) for p in page_phone_numbers)}")
@@ -161,97 +480,142 @@ def find_phone_numbers(text_pages, config):
     return all_phone_numbers
 
 
-def redact_phone_numbers(pdf_document, all_phone_numbers, config):
+def redact_phone_numbers(pdf_document, all_phone_numbers, config, rect_index=None):
     if len(all_phone_numbers) > 0:
         print("\n[i] Redacting Phone Numbers...\n")
         # iterate through each page of pdf
         for page_num in tqdm(range(len(pdf_document)), desc="[i] Redacting Pages", unit="page"):
+            if not all_phone_numbers[page_num]:
+                continue
             page = pdf_document.load_page(page_num)
-            rect_list = []
-            # for every detected phonenumber on page, find position on page and get Rect object, safe to list
-            for phone_number in all_phone_numbers[page_num]:
-                rect_list.extend(page.search_for(phone_number))
-                # for every phone number found, add redaction
-                for rect in rect_list:
-
-                    fill_color = hex_to_rgb(config.color_hex) if config.color_hex else COLOR_MAP[config.color]
-                    text_fill_color = hex_to_rgb(config.text_color_hex) if config.text_color_hex else COLOR_MAP[config.text_color]
-
-                    annots = page.add_redact_annot(quad=rect, text=config.text, text_color=text_fill_color, fill=fill_color, cross_out=True)
-
-                    if config.preview:
-                            preview_redactions(page, annots)
-                    else:
-                        # apply redactions to page    
-                        page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE)
+            # for every detected phonenumber on page, find position on page and get Rect object
+            rect_list = search_page(page, all_phone_numbers[page_num])
+            redact_rects(page, rect_list, config, rect_index)
     else:
         print("\n[i] No Phone Number found...\n")
 
 
 
 ### LINKS
-def redact_links(pdf_document, config):
+def find_links(pdf_document, pages=None):
     print("\n[i] Searching for Links...")
-    # for every text page in list of all pages, find all links and append to list of all links
-    for page_num in tqdm(range(len(pdf_document)), desc="[i] Redacting Pages", unit="page"):
+    all_links = {page_num: [] for page_num in range(len(pdf_document))}
+    # for every page in pdf, get all links, reading them does not require any rendering
+    for page_num in (range(len(pdf_document)) if pages is None else pages):
         page = pdf_document.load_page(page_num)
         link_list = page.get_links()
-        print(f" |  Found {len(link_list)} Link{'' if len(link_list)==1 else 's'} on Page {page_num+1}: {', '.join(str(p['uri']) for p in link_list)}")
-        rect_list = [item['from'] for item in link_list]
-        for rect in rect_list:
+        all_links[page_num] = link_list
+        print(f" |  Found {len(link_list)} Link{'' if len(link_list)==1 else 's'} on Page {page_num+1}: {', '.join(str(p.get('uri')) for p in link_list)}")
 
-            fill_color = hex_to_rgb(config.color_hex) if config.color_hex else COLOR_MAP[config.color]
-            text_fill_color = hex_to_rgb(config.text_color_hex) if config.text_color_hex else COLOR_MAP[config.text_color]
+    return all_links
 
-            annots = page.add_redact_annot(quad=rect, text=config.text, text_color=text_fill_color, fill=fill_color, cross_out=True)
 
-            if config.preview:
-                preview_redactions(page, annots)
-            else:
-                # apply redactions to page    
-                page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE)
+def redact_links(pdf_document, config, rect_index=None, pages=None):
+    all_links = find_links(pdf_document, pages)
+    for page_num in tqdm(range(len(pdf_document)), desc="[i] Redacting Pages", unit="page"):
+        if not all_links[page_num]:
+            continue
+        page = pdf_document.load_page(page_num)
+        rect_list = [item['from'] for item in all_links[page_num]]
+        redact_rects(page, rect_list, config, rect_index)
 
 
 
 ### EMAIL ADRESSES
-def find_email_addresses(text_pages):
+# local part and domain labels are bounded and a match can only start at the beginning of a word,
+# so every character is looked at a bounded number of times, even in long runs without whitespace
+EMAIL_PATTERN = re.compile(r"(?<![\w.%+-])[\w.%+-]{1,64}@[\w-]{1,63}(?:\.[\w-]{1,63}){1,8}")
+
+def find_email_addresses(text_pages, budget=DETECTION_BUDGET):
     print("\n[i] Searching for Email Addresses...")
     all_email_addresses = {}
-    extract_email_pattern = r"\S+@\S+\.\S+"
     for i, page in enumerate(text_pages):
-        match = re.findall(extract_email_pattern, page)
+        match = [m.group() for m in within_budget(EMAIL_PATTERN.finditer(page), budget, "Email Address", i)]
         all_email_addresses[i] = match
         print(f" |  Found {len(match)} Email Address{'' if len(match)==1 else 'es'} on Page {i+1}: {', '.join(str(p) for p in match)}")
     return all_email_addresses        
     
 
-def redact_email_adresses(pdf_document, all_email_addresses, config):
+def redact_email_adresses(pdf_document, all_email_addresses, config, rect_index=None):
     if len(all_email_addresses) > 0:
         print("\n[i] Redacting Email Addresses...\n")
         for page_num in tqdm(range(len(pdf_document)), desc="[i] Redacting Pages", unit="page"):
+            if not all_email_addresses[page_num]:
+                continue
             page = pdf_document.load_page(page_num)
-            rect_list = []
-            for email_address in all_email_addresses[page_num]:
-                    rect_list.extend(page.search_for(email_address))
-                    # for every phone number found, add redaction
-                    for rect in rect_list:
-
-                        fill_color = hex_to_rgb(config.color_hex) if config.color_hex else COLOR_MAP[config.color]
-                        text_fill_color = hex_to_rgb(config.text_color_hex) if config.text_color_hex else COLOR_MAP[config.text_color]
-
-                        annots = page.add_redact_annot(quad=rect, text=config.text, text_color=text_fill_color, fill=fill_color, cross_out=True)
-                        if config.preview:
-                            preview_redactions(page, annots)
-                        else:
-                            # apply redactions to page    
-                            page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE)
+            rect_list = search_page(page, all_email_addresses[page_num])
+            redact_rects(page, rect_list, config, rect_index)
     else:
         print("\n[i] No Email Address found.\n")
 
 
 
 ### CUSTOM SEARCH MASK
-def find_custom_mask(text_pages, custom_masks):
+# compile all custom masks into a single pattern, so every page is searched in one pass
+# masks are matched literally unless regex is set, longer masks win over masks they start with
+# unbounded quantifiers (*, +, {n,}) at the start of a string
+UNBOUNDED_QUANTIFIER_PATTERN = re.compile(r"[*+]|\{\d*,\}")
+
+# check whether a regex repeats a group that contains an unbounded quantifier itself, e.g. (\w+\s?)+
+# such regexes backtrack exponentially on text that almost matches
+def nested_quantifier(pattern):
+    # per open group: whether it contains an unbounded quantifier
+    groups = [False]
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        nested = False
+        if c == "(":
+            groups.append(False)
+            i += 1
+            continue
+        elif c == ")" and len(groups) > 1:
+            nested = groups.pop()
+            groups[-1] = groups[-1] or nested
+            i += 1
+        elif c == "[":
+            # skip the character class, a leading ] is part of it
+            i += 2 if pattern[i+1:i+2] == "^" else 1
+            i += 1 if pattern[i:i+1] == "]" else 0
+            while i < len(pattern) and pattern[i] != "]":
+                i += 2 if pattern[i] == "\\" else 1
+            i += 1
+        elif c == "\\":
+            i += 2
+        else:
+            i += 1
+
+        quantifier = UNBOUNDED_QUANTIFIER_PATTERN.match(pattern, i)
+        if quantifier:
+            if nested:
+                return True
+            groups[-1] = True
+            i = quantifier.end()
+    return False
+
+def compile_masks(masks, regex=False):
+    if regex:
+        alternatives = "|".join(r'\b(?:'+mask+r')\b' for mask in masks)
+        # the regex module can stop a mask at the detection budget, re cannot
+        if regex_module is not None:
+            return regex_module.compile(alternatives, flags=regex_module.IGNORECASE | regex_module.VERSION0)
+        for mask in masks:
+            if nested_quantifier(mask):
+                raise ValueError(f"Regex mask {mask!r} repeats a group that contains a repetition itself and may run for hours. "
+                                 "Rewrite it or install the 'regex' package, which stops masks at the detection budget.")
+        return re.compile(alternatives, flags=re.IGNORECASE)
+    alternatives = "|".join(re.escape(mask) for mask in sorted(masks, key=len, reverse=True))
+    # lookarounds instead of \b, so masks starting or ending with punctuation (e.g. "C++") still match
+    return re.compile(r'(?<!\w)(?:'+alternatives+r')(?!\w)', flags=re.IGNORECASE)
+
+# iterate the matches of a compiled mask, patterns of the regex module raise TimeoutError after timeout seconds
+def iter_mask_matches(pattern, text, timeout):
+    if regex_module is not None and isinstance(pattern, regex_module.Pattern):
+        return pattern.finditer(text, timeout=timeout)
+    return pattern.finditer(text)
+
+# text a regex mask timed out on is added to unscanned ({page_num: [(start, end)]}), if given
+def find_custom_mask(text_pages, custom_masks, regex=False, budget=DETECTION_BUDGET, pattern=None, unscanned=None):
     print("\n[i] Searching for Custom Mask matches...")
     all_hits = {}
     
@@ -259,16 +623,23 @@ def find_custom_mask(text_pages, custom_masks):
     for i in range(len(text_pages)):
         all_hits[i] = []
     
-    # Search for each mask
-    for mask in custom_masks:
-        print(f"\n[i] Searching for mask: '{mask}'")
-        match_pattern = r'\b'+mask+r'\b'
-        for i, page in enumerate(text_pages):
-            matches = re.findall(match_pattern, page, flags=re.IGNORECASE)
-            # Add matches to the existing list for this page
-            all_hits[i].extend(matches)
-            if matches:
-                print(f" |  Found {len(matches)} match{'' if len(matches)==1 else 'es'} on Page {i+1}: {', '.join(str(p) for p in matches)}")
+    # Search for all masks at once
+    print(f"\n[i] Searching for mask{'' if len(custom_masks)==1 else 's'}: {', '.join(repr(mask) for mask in custom_masks)}")
+    match_pattern = pattern if pattern is not None else compile_masks(custom_masks, regex)
+    for i, page in enumerate(text_pages):
+        matches = []
+        pos = 0
+        try:
+            for m in within_budget(iter_mask_matches(match_pattern, page, budget), budget, "Custom Mask", i):
+                matches.append(m.group())
+                pos = m.end()
+        except TimeoutError:
+            print(f"[Warning] Custom Mask detection exceeded its budget of {budget}s on Page {i+1}, skipping remaining matches.")
+            if unscanned is not None:
+                unscanned.setdefault(i, []).append((pos, len(page)))
+        all_hits[i] = matches
+        if matches:
+            print(f" |  Found {len(matches)} match{'' if len(matches)==1 else 'es'} on Page {i+1}: {', '.join(str(p) for p in matches)}")
 
     # Count total matches per page
     total_matches = 0
@@ -279,208 +650,684 @@ def find_custom_mask(text_pages, custom_masks):
     return all_hits     
 
 
-def redact_custom_mask(pdf_document, hits, config):
+def redact_custom_mask(pdf_document, hits, config, rect_index=None):
     if len(hits) > 0:
         print("\n[i] Redacting Custom Mask Matches...\n")
 
         # Iterate through pages
         for page_num in tqdm(range(len(pdf_document)), desc="[i] Redacting Pages", unit="page"):
+            if not hits[page_num]:
+                continue
             page = pdf_document.load_page(page_num)
-            rect_list = []
 
-            # Remove duplicates while preserving order
-            unique_matches = list(dict.fromkeys(hits[page_num]))
-            
-            for match in unique_matches:
-                found_rects = page.search_for(match)
-                for rect in found_rects:
-                    # Ensure this rectangle is not already in the list
-                    if not any(existing_rect.x0 == rect.x0 and existing_rect.y0 == rect.y0 and 
-                               existing_rect.x1 == rect.x1 and existing_rect.y1 == rect.y1 for existing_rect in rect_list):
-                        rect_list.append(rect)
-
-            # Iterate through found text positions and apply redaction
-            for rect in rect_list:
-                
-                fill_color = hex_to_rgb(config.color_hex) if config.color_hex else COLOR_MAP[config.color]
-                text_fill_color = hex_to_rgb(config.text_color_hex) if config.text_color_hex else COLOR_MAP[config.text_color]
-
-                annots = page.add_redact_annot(quad=rect, text=config.text, text_color=text_fill_color, fill=fill_color, cross_out=True)
-
-                if config.preview:
-                    preview_redactions(page, annots)
-                else:
-                    # Apply redactions to the page
-                    page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE)
+            # Duplicate and overlapping rectangles are merged by the page index
+            rect_list = search_page(page, hits[page_num])
+            redact_rects(page, rect_list, config, rect_index)
     else:
         print("\n[i] No Custom Mask matches found.\n")
 
 
 
 ### IBAN
-def find_ibans(text_pages):
+# IBAN length per country (SWIFT IBAN registry)
+IBAN_LENGTHS = {
+    "AD": 24, "AE": 23, "AL": 28, "AT": 20, "AZ": 28, "BA": 20, "BE": 16, "BG": 22, "BH": 22, "BI": 27,
+    "BR": 29, "BY": 28, "CH": 21, "CR": 22, "CY": 28, "CZ": 24, "DE": 22, "DJ": 27, "DK": 18, "DO": 28,
+    "EE": 20, "EG": 29, "ES": 24, "FI": 18, "FK": 18, "FO": 18, "FR": 27, "GB": 22, "GE": 22, "GI": 23,
+    "GL": 18, "GR": 27, "GT": 28, "HR": 21, "HU": 28, "IE": 22, "IL": 23, "IQ": 23, "IS": 26, "IT": 27,
+    "JO": 30, "KW": 30, "KZ": 20, "LB": 28, "LC": 32, "LI": 21, "LT": 20, "LU": 20, "LV": 21, "LY": 25,
+    "MC": 27, "MD": 24, "ME": 22, "MK": 19, "MN": 20, "MR": 27, "MT": 31, "MU": 30, "NI": 28, "NL": 18,
+    "NO": 15, "OM": 23, "PK": 24, "PL": 28, "PS": 29, "PT": 25, "QA": 29, "RO": 24, "RS": 22, "RU": 33,
+    "SA": 24, "SC": 31, "SD": 18, "SE": 24, "SI": 19, "SK": 24, "SM": 27, "SO": 23, "ST": 25, "SV": 28,
+    "TL": 23, "TN": 24, "TR": 26, "UA": 29, "VA": 22, "VG": 24, "XK": 20, "YE": 30,
+}
+
+# BBAN structure of common countries: n = digits, a = upper case letters, c = alphanumeric
+IBAN_BBAN_FORMATS = {
+    "AT": "16n", "BE": "12n", "BG": "4a6n8c", "CH": "5n12c", "CZ": "20n", "DE": "18n", "DK": "14n",
+    "ES": "20n", "FI": "14n", "FR": "10n11c2n", "GB": "4a14n", "GR": "7n16c", "HR": "17n", "HU": "24n",
+    "IE": "4a14n", "IT": "1a10n12c", "LI": "5n12c", "LU": "3n13c", "NL": "4a10n", "NO": "11n", "PL": "24n",
+    "PT": "21n", "RO": "4a16c", "SE": "20n", "SI": "15n", "SK": "20n",
+}
+
+def _compile_bban_format(spec):
+    classes = {"n": "[0-9]", "a": "[A-Z]", "c": "[A-Z0-9]"}
+    return re.compile("".join(f"{classes[kind]}{{{count}}}" for count, kind in re.findall(r"(\d+)([nac])", spec)))
+
+IBAN_BBAN_PATTERNS = {country: _compile_bban_format(spec) for country, spec in IBAN_BBAN_FORMATS.items()}
+
+# country code, check digits and 11-30 alphanumerics, optionally grouped by spaces
+# the candidate may run into the following word, it is cut to the length of its country during validation
+IBAN_CANDIDATE_PATTERN = re.compile(r"\b[A-Z]{2}[0-9]{2}(?:[ ]?[A-Z0-9]){11,30}\b", flags=re.IGNORECASE)
+
+# ISO 7064 mod 97-10 checksum of a compact IBAN
+def iban_checksum_valid(iban):
+    rearranged = iban[4:] + iban[:4]
+    return int("".join(str(int(c, 36)) for c in rearranged)) % 97 == 1
+
+# validate an IBAN candidate (country length, structure and checksum), returns the valid IBAN as written or None
+def validate_iban(candidate):
+    length = IBAN_LENGTHS.get(candidate[:2].upper())
+    if length is None:
+        return None
+
+    # position in the candidate after the last character of an IBAN of the expected length
+    count = 0
+    for end, c in enumerate(candidate):
+        if c != " ":
+            count += 1
+            if count == length:
+                break
+    else:
+        return None
+    end += 1
+    # the IBAN must end at a word or group boundary
+    if end < len(candidate) and candidate[end] != " ":
+        return None
+
+    iban = candidate[:end].replace(" ", "").upper()
+    if not 2 <= int(iban[2:4]) <= 98:
+        return None
+    bban_pattern = IBAN_BBAN_PATTERNS.get(iban[:2])
+    if bban_pattern is not None and not bban_pattern.fullmatch(iban[4:]):
+        return None
+    if not iban_checksum_valid(iban):
+        return None
+    return candidate[:end]
+
+# find all valid IBANs in a text
+def iter_ibans_in_text(text):
+    pos = 0
+    while (m := IBAN_CANDIDATE_PATTERN.search(text, pos)) is not None:
+        iban = validate_iban(m.group())
+        if iban:
+            yield iban
+            pos = m.start() + len(iban)
+        else:
+            # a rejected candidate may still swallow the beginning of a following IBAN
+            pos = m.start() + 1
+
+def find_ibans(text_pages, budget=DETECTION_BUDGET):
     print("\n[i] Searching for IBANs...")
     hits = {}
-    match_pattern = r'\b[A-Z]{2}[0-9]{2}(?:[ ]?[0-9]{4}){4}(?!(?:[ ]?[0-9]){3})(?:[ ]?[0-9]{1,2})?\b'
-    #match_pattern = r"^[A-Z]{6}[A-Z0-9]{2}([A-Z0-9]{3})?$"
     for i, page in enumerate(text_pages):
-        match = re.findall(match_pattern, page, flags=re.IGNORECASE)
+        match = list(within_budget(iter_ibans_in_text(page), budget, "IBAN", i))
         hits[i] = match
         print(f" |  Found {len(match)} IBAN{'' if len(match)==1 else 's'} on Page {i+1}: {', '.join(str(p) for p in match)}")
 
     return hits  
 
-def redact_ibans(pdf_document, hits, config):
+def redact_ibans(pdf_document, hits, config, rect_index=None):
     if len(hits) > 0:
         print("\n[i] Redacting IBANs...\n")
         for page_num in tqdm(range(len(pdf_document)), desc="[i] Redacting Pages", unit="page"):
+            if not hits[page_num]:
+                continue
             page = pdf_document.load_page(page_num)
-            rect_list = []
-            for match in hits[page_num]:
-                    rect_list.extend(page.search_for(match))
-                    # for every phone number found, add redaction
-                    for rect in rect_list:
-                        
-                        fill_color = hex_to_rgb(config.color_hex) if config.color_hex else COLOR_MAP[config.color]
-                        text_fill_color = hex_to_rgb(config.text_color_hex) if config.text_color_hex else COLOR_MAP[config.text_color]
-
-                        annots = page.add_redact_annot(quad=rect, text=config.text, text_color=text_fill_color, fill=fill_color, cross_out=True)
-
-                        if config.preview:
-                            preview_redactions(page, annots)
-                        else:
-                            # apply redactions to page    
-                            page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE)
+            rect_list = search_page(page, hits[page_num])
+            redact_rects(page, rect_list, config, rect_index)
     else:
          print("\n[i] No IBAN found.\n")
 
 
 
 ### BIC
-def find_bics(text_pages):
+# ISO 3166-1 alpha-2 country codes (and XK for Kosovo) used in the country part of a BIC
+BIC_COUNTRY_CODES = frozenset("""
+AD AE AF AG AI AL AM AO AQ AR AS AT AU AW AX AZ BA BB BD BE BF BG BH BI BJ BL BM BN BO BQ BR BS BT BV BW BY BZ
+CA CC CD CF CG CH CI CK CL CM CN CO CR CU CV CW CX CY CZ DE DJ DK DM DO DZ EC EE EG EH ER ES ET FI FJ FK FM FO FR
+GA GB GD GE GF GG GH GI GL GM GN GP GQ GR GS GT GU GW GY HK HM HN HR HT HU ID IE IL IM IN IO IQ IR IS IT JE JM JO JP
+KE KG KH KI KM KN KP KR KW KY KZ LA LB LC LI LK LR LS LT LU LV LY MA MC MD ME MF MG MH MK ML MM MN MO MP MQ MR MS MT
+MU MV MW MX MY MZ NA NC NE NF NG NI NL NO NP NR NU NZ OM PA PE PF PG PH PK PL PM PN PR PS PT PW PY QA RE RO RS RU RW
+SA SB SC SD SE SG SH SI SJ SK SL SM SN SO SR SS ST SV SX SY SZ TC TD TF TG TH TJ TK TL TM TN TO TR TT TV TW TZ UA UG
+UM US UY UZ VA VC VE VG VI VN VU WF WS XK YE YT ZA ZM ZW
+""".split())
+
+# labels that announce a BIC, required in front of BICs consisting of letters only in strict mode
+BIC_CONTEXT_PATTERN = re.compile(r"\b(?:bic|swift)", flags=re.IGNORECASE)
+# start of an IBAN, BICs made of letters only next to one are accepted like labelled ones
+BIC_IBAN_CONTEXT_PATTERN = re.compile(r"\b[A-Z]{2}[0-9]{2}(?: ?[A-Z0-9]{4}){2}")
+# number of characters around a BIC that are searched for a label (in front) or an IBAN (in front and after)
+BIC_CONTEXT_WINDOW = 48
+# share of upper case letters from which a page counts as set in capitals (legal boilerplate)
+BIC_UPPER_CASE_PAGE = 0.6
+
+# word in front of and after position start/end on the same line, None at the start/end of the line
+BIC_PREVIOUS_WORD_PATTERN = re.compile(r"(\S+)[ \t]*$")
+BIC_NEXT_WORD_PATTERN = re.compile(r"[ \t]*(\S+)")
+
+BIC_CANDIDATE_PATTERN = re.compile(r"\b[A-Z]{6}[A-Z0-9]{2}(?:[A-Z0-9]{3})?\b")
+
+# load a registry of known BICs (one per line, 8 or 11 characters), matched on their first 8 characters
+@functools.lru_cache(maxsize=4)
+def load_bic_registry(file_path):
+    with open(file_path, encoding="utf-8") as f:
+        return frozenset(line.strip().upper()[:8] for line in f if len(line.strip()) in (8, 11))
+
+# validate a BIC candidate found at position start of text
+# strict: BICs made of letters only need a BIC/SWIFT label or an IBAN nearby
+def validate_bic(bic, text, start, registry=None, strict=False):
+    # with a registry, only known BICs are accepted
+    if registry is not None:
+        return bic[:8] in registry
+    if bic[4:6] not in BIC_COUNTRY_CODES:
+        return False
+    # the letter O is not allowed as second character of the location code
+    if bic[7] == "O":
+        return False
+    # branch codes starting with X are only used as XXX (primary office)
+    if len(bic) == 11 and bic[8] == "X" and bic[8:] != "XXX":
+        return False
+    if bic.isalpha():
+        return bic_context_valid(text, start, start + len(bic), strict)
+    return True
+
+# words of at least 3 letters set in capitals, punctuation is ignored
+def _upper_case_word(word):
+    letters = "".join(c for c in word if c.isalpha())
+    return len(letters) >= 3 and letters.isupper()
+
+# pages mostly set in capitals, cached as it is asked for every candidate on the page
+@functools.lru_cache(maxsize=4)
+def _upper_case_page(text):
+    upper = len(re.findall(r"[A-Z]", text))
+    return upper > BIC_UPPER_CASE_PAGE * (upper + len(re.findall(r"[a-z]", text)))
+
+def bic_context_valid(text, start, end, strict=False):
+    """
+    BICs made of letters only look like any upper case word (PROPERTY, TERMINATION), so their context decides.
+    A BIC/SWIFT label in front or an IBAN nearby accepts them. In strict mode nothing else does, otherwise
+    they are rejected next to other upper case words, alone on their line (headings) or on pages set in capitals.
+    """
+    if BIC_CONTEXT_PATTERN.search(text, max(0, start - BIC_CONTEXT_WINDOW), start):
+        return True
+    if BIC_IBAN_CONTEXT_PATTERN.search(text[max(0, start - BIC_CONTEXT_WINDOW):end + BIC_CONTEXT_WINDOW]):
+        return True
+    if strict:
+        return False
+
+    # the neighbouring words are looked up within the context window, long lines would make this quadratic
+    window_start = max(0, start - BIC_CONTEXT_WINDOW)
+    window_end = min(len(text), end + BIC_CONTEXT_WINDOW)
+    line_start = max(window_start, text.rfind("\n", window_start, start) + 1)
+    line_end = text.find("\n", end, window_end)
+    previous = BIC_PREVIOUS_WORD_PATTERN.search(text, line_start, start)
+    following = BIC_NEXT_WORD_PATTERN.match(text, end, window_end if line_end == -1 else line_end)
+    if previous is None and following is None:
+        return False
+    if any(word is not None and _upper_case_word(word.group(1)) for word in (previous, following)):
+        return False
+    return not _upper_case_page(text)
+
+# registry is the path of a BIC registry file or an already loaded set of BICs
+def find_bics(text_pages, registry=None, budget=DETECTION_BUDGET, strict=False):
     print("\n[i] Searching for BICs...")
     hits = {}
-    match_pattern = r"\b[A-Z]{6}[A-Z0-9]{2}[A-Z0-9]{3}?\b"
+    if isinstance(registry, str):
+        registry = load_bic_registry(registry)
     for i, page in enumerate(text_pages):
-        match = re.findall(match_pattern, page)
+        candidates = within_budget(BIC_CANDIDATE_PATTERN.finditer(page), budget, "BIC", i)
+        match = [m.group() for m in candidates if validate_bic(m.group(), page, m.start(), registry, strict)]
         hits[i] = match
         print(f" |  Found {len(match)} BIC{'' if len(match)==1 else 's'} on Page {i+1}: {', '.join(str(p) for p in match)}")
 
     return hits  
 
-def redact_bics(pdf_document, hits, config):
+def redact_bics(pdf_document, hits, config, rect_index=None):
     if len(hits) > 0:
         print("\n[i] Redacting BICs...\n")
         for page_num in tqdm(range(len(pdf_document)), desc="[i] Redacting Pages", unit="page"):
+            if not hits[page_num]:
+                continue
             page = pdf_document.load_page(page_num)
-            rect_list = []
-            for match in hits[page_num]:
-                    rect_list.extend(page.search_for(match))
-                    # for every phone number found, add redaction
-                    for rect in rect_list:
-
-                        fill_color = hex_to_rgb(config.color_hex) if config.color_hex else COLOR_MAP[config.color]
-                        text_fill_color = hex_to_rgb(config.text_color_hex) if config.text_color_hex else COLOR_MAP[config.text_color]
-
-                        annots = page.add_redact_annot(quad=rect, text=config.text, text_color=text_fill_color, fill=fill_color, cross_out=True)
-
-                        if config.preview:
-                            preview_redactions(page, annots)
-                        else:
-                            # apply redactions to page    
-                            page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE)
+            rect_list = search_page(page, hits[page_num])
+            redact_rects(page, rect_list, config, rect_index)
     else:
          print("\n[i] No BIC found.\n")
 
 
+### DATE/TIME TOKENIZER
+
+# month names (and their common abbreviations) per locale, in calendar order
+MONTH_NAMES = {
+    "en": [["january", "jan"], ["february", "feb"], ["march", "mar"], ["april", "apr"], ["may"], ["june", "jun"],
+           ["july", "jul"], ["august", "aug"], ["september", "sep", "sept"], ["october", "oct"], ["november", "nov"], ["december", "dec"]],
+    "de": [["januar", "jänner", "jan"], ["februar", "feb"], ["märz", "maerz", "mär"], ["april", "apr"], ["mai"], ["juni", "jun"],
+           ["juli", "jul"], ["august", "aug"], ["september", "sep", "sept"], ["oktober", "okt"], ["november", "nov"], ["dezember", "dez"]],
+    "fr": [["janvier", "janv"], ["février", "fevrier", "févr", "fevr"], ["mars"], ["avril", "avr"], ["mai"], ["juin"],
+           ["juillet", "juil"], ["août", "aout"], ["septembre", "sept"], ["octobre", "oct"], ["novembre", "nov"], ["décembre", "decembre", "déc", "dec"]],
+    "es": [["enero", "ene"], ["febrero", "feb"], ["marzo", "mar"], ["abril", "abr"], ["mayo", "may"], ["junio", "jun"],
+           ["julio", "jul"], ["agosto", "ago"], ["septiembre", "setiembre", "sep", "sept"], ["octubre", "oct"], ["noviembre", "nov"], ["diciembre", "dic"]],
+    "it": [["gennaio", "gen"], ["febbraio", "feb"], ["marzo", "mar"], ["aprile", "apr"], ["maggio", "mag"], ["giugno", "giu"],
+           ["luglio", "lug"], ["agosto", "ago"], ["settembre", "set"], ["ottobre", "ott"], ["novembre", "nov"], ["dicembre", "dic"]],
+    "nl": [["januari", "jan"], ["februari", "feb"], ["maart", "mrt"], ["april", "apr"], ["mei"], ["juni", "jun"],
+           ["juli", "jul"], ["augustus", "aug"], ["september", "sep", "sept"], ["oktober", "okt"], ["november", "nov"], ["december", "dec"]],
+}
+
+# words following a time of day
+TIME_SUFFIXES = {"am", "pm", "h", "uhr"}
+# words that may join day, month name and year (3 de marzo de 2021, 3 de marzo del 2021)
+DATE_CONNECTORS = {"de", "del"}
+
+# precompute one lookup table (casefolded name -> month number) for the given locales
+def build_month_table(locales=None):
+    table = {}
+    for locale in (locales or MONTH_NAMES):
+        for month, names in enumerate(MONTH_NAMES[locale], start=1):
+            for name in names:
+                table[name.casefold()] = month
+    return table
+
+MONTH_TABLE = build_month_table()
+
+# token kinds
+NUM, WORD, PUNCT = 0, 1, 2
+
+# numbers, words and single punctuation characters, whitespace separates tokens
+# every alternative consumes its characters exactly once, so tokenizing is linear in the length of the text
+DATE_TOKEN_PATTERN = re.compile(r"(\d+)|([^\W\d_]+)|(\S)")
+
+# split text into (kind, value, start, end) tokens, cached so that date and time detection tokenize a page only once
+@functools.lru_cache(maxsize=16)
+def tokenize_text(text):
+    return tuple((m.lastindex - 1, m.group(), m.start(), m.end()) for m in DATE_TOKEN_PATTERN.finditer(text))
+
+# token k+1 directly follows token k
+def _joined(tokens, k):
+    return tokens[k][3] == tokens[k+1][2]
+
+# token k+1 follows token k after a short whitespace gap on the same line
+def _spaced(text, tokens, k):
+    gap = tokens[k+1][2] - tokens[k][3]
+    return 0 < gap <= 3 and "\n" not in text[tokens[k][3]:tokens[k+1][2]]
+
+# separator after token k: returns (index of next token, separator char), " " for plain whitespace
+def _separator(text, tokens, k):
+    if k + 1 >= len(tokens):
+        return None
+    kind, value, _, _ = tokens[k+1]
+    if kind == PUNCT and value in "./-," and _joined(tokens, k):
+        if k + 2 < len(tokens) and (_joined(tokens, k+1) or _spaced(text, tokens, k+1)):
+            return k + 2, value
+        return None
+    if _spaced(text, tokens, k):
+        return k + 1, " "
+    return None
+
+# token after a connector word at token k (de, del), or k itself
+def _skip_connector(text, tokens, k):
+    if tokens[k][0] == WORD and tokens[k][1].casefold() in DATE_CONNECTORS and k + 1 < len(tokens) and _spaced(text, tokens, k):
+        return k + 1
+    return k
+
+# number of 1-2 (or exactly 4) digits at token k
+def _number(tokens, k, digits=(1, 2)):
+    if k < len(tokens) and tokens[k][0] == NUM and len(tokens[k][1]) in digits:
+        return int(tokens[k][1])
+    return None
+
+# day at token k, optionally followed by an ordinal suffix (10th): returns (day, last token index)
+def _day(tokens, k):
+    day = _number(tokens, k)
+    if day is None:
+        return None
+    if k + 1 < len(tokens) and _joined(tokens, k) and tokens[k+1][1].casefold() in ("st", "nd", "rd", "th"):
+        return day, k + 1
+    return day, k
+
+# 4 or 2 digit year at token k
+def _year(tokens, k):
+    year = _number(tokens, k, (2, 4))
+    if year is None or (year >= 100 and not 1000 <= year <= 2999):
+        return None
+    return year
+
+def _valid_date(day, month, year):
+    if not 1 <= month <= 12 or day < 1:
+        return False
+    # 2 digit years are treated as 20yy
+    leap = year % 4 == 0 and (year % 100 != 0 or year % 400 == 0 or year < 100)
+    return day <= (31, 29 if leap else 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)[month-1]
+
+# the match must not continue a number or word directly before token k (e.g. 1.10.5.2023, abc10.5.2023)
+def _free_before(tokens, k, allowed_words=()):
+    if k == 0 or not _joined(tokens, k-1):
+        return True
+    kind, value, _, _ = tokens[k-1]
+    if kind == WORD:
+        return value in allowed_words
+    return not (kind == PUNCT and value in "./-:" and k >= 2 and _joined(tokens, k-2) and tokens[k-2][0] == NUM)
+
+# the match must not continue with a word or number directly after token k (e.g. 10.5.2023.1, 12:30:45:10)
+def _free_after(tokens, k, allowed_words=()):
+    if k + 1 >= len(tokens) or not _joined(tokens, k):
+        return True
+    kind, value, _, _ = tokens[k+1]
+    if kind == WORD:
+        return value in allowed_words
+    if kind != PUNCT:
+        return False
+    return not (value in "./-:," and k + 2 < len(tokens) and _joined(tokens, k+1) and tokens[k+2][0] == NUM)
+
+# try to match a date starting at token i, returns the index of its last token
+def _match_date(text, tokens, i, month_table):
+    if not _free_before(tokens, i):
+        return None
+    kind, value, _, _ = tokens[i]
+
+    # month name first: Aug 10, 2033
+    if kind == WORD:
+        month = month_table.get(value.casefold())
+        sep1 = _separator(text, tokens, i) if month else None
+        if sep1 is None or sep1[1] not in ". ":
+            return None
+        day = _day(tokens, sep1[0])
+        sep2 = _separator(text, tokens, day[1]) if day else None
+        if sep2 is None or sep2[1] not in ", ":
+            return None
+        year = _year(tokens, sep2[0])
+        if year is None or not _valid_date(day[0], month, year) or not _free_after(tokens, sep2[0], allowed_words=("T",)):
+            return None
+        return sep2[0]
+
+    if kind != NUM:
+        return None
+
+    # year first: 2023-05-10
+    if len(value) == 4:
+        year = _year(tokens, i)
+        sep1 = _separator(text, tokens, i) if year else None
+        if sep1 is None or sep1[1] not in "./-":
+            return None
+        month = _number(tokens, sep1[0])
+        sep2 = _separator(text, tokens, sep1[0]) if month else None
+        if sep2 is None or sep2[1] != sep1[1]:
+            return None
+        day = _number(tokens, sep2[0])
+        if day is None or not _valid_date(day, month, year) or not _free_after(tokens, sep2[0], allowed_words=("T",)):
+            return None
+        return sep2[0]
+
+    # day first: 10/5/2023, 7. Januar 2018, 10th Aug 2033, 3 de marzo de 2021
+    day = _day(tokens, i)
+    sep1 = _separator(text, tokens, day[1]) if day else None
+    if sep1 is None or sep1[1] == ",":
+        return None
+    k = sep1[0]
+    m = _skip_connector(text, tokens, k) if sep1[1] == " " else k
+    month = month_table.get(tokens[m][1].casefold()) if tokens[m][0] == WORD else None
+    if month is not None:
+        sep2 = _separator(text, tokens, m)
+        if sep2 is None:
+            return None
+        y = _skip_connector(text, tokens, sep2[0]) if sep2[1] == " " else sep2[0]
+        year = _year(tokens, y)
+        if year is None or not _valid_date(day[0], month, year) or not _free_after(tokens, y, allowed_words=("T",)):
+            return None
+        return y
+
+    # all numeric: same punctuation separator twice, day first or (US) month first
+    second = _number(tokens, k)
+    if second is None or day[1] != i or sep1[1] not in "./-":
+        return None
+    sep2 = _separator(text, tokens, k)
+    if sep2 is None or sep2[1] != sep1[1]:
+        return None
+    year = _year(tokens, sep2[0])
+    if year is None or not _free_after(tokens, sep2[0], allowed_words=("T",)):
+        return None
+    if _valid_date(day[0], second, year) or _valid_date(second, day[0], year):
+        return sep2[0]
+    return None
+
+# find all dates in a text, every token is visited once and a match looks at a bounded number of tokens
+def iter_dates_in_text(text, month_table=MONTH_TABLE):
+    tokens = tokenize_text(text)
+    i = 0
+    while i < len(tokens):
+        end = _match_date(text, tokens, i, month_table)
+        if end is None:
+            i += 1
+        else:
+            yield text[tokens[i][2]:tokens[end][3]]
+            i = end + 1
+
+# try to match a time of day starting at token i, returns the index of its last token
+def _match_time(text, tokens, i):
+    n = len(tokens)
+    hour = _number(tokens, i)
+    if hour is None or hour > 23 or i + 2 >= n or not _free_before(tokens, i, allowed_words=("T",)):
+        return None
+    if tokens[i+1][1] != ":" or not _joined(tokens, i) or not _joined(tokens, i+1):
+        return None
+    minute = _number(tokens, i+2, (2,))
+    if minute is None or minute > 59:
+        return None
+    end = i + 2
+
+    # optional seconds
+    seconds = False
+    if end + 2 < n and tokens[end+1][1] == ":" and _joined(tokens, end) and _joined(tokens, end+1):
+        second = _number(tokens, end+2, (2,))
+        if second is not None and second <= 59:
+            end += 2
+            seconds = True
+
+    # optional suffix: am, pm, a.m., p.m., h, Uhr
+    suffix = False
+    if end + 1 < n and (_joined(tokens, end) or _spaced(text, tokens, end)) and tokens[end+1][0] == WORD:
+        word = tokens[end+1][1].casefold()
+        if word in TIME_SUFFIXES and hour <= (12 if word in ("am", "pm") else 23):
+            end += 1
+            suffix = True
+        elif word in ("a", "p") and end + 3 < n and tokens[end+2][1] == "." and tokens[end+3][1].casefold() == "m" \
+                and _joined(tokens, end+1) and _joined(tokens, end+2) and hour <= 12:
+            end += 3
+            if end + 1 < n and tokens[end+1][1] == "." and _joined(tokens, end):
+                end += 1
+            suffix = True
+
+    if not _free_after(tokens, end):
+        return None
+
+    # a single digit hour without seconds or suffix is more likely a score or a verse reference (John 3:16)
+    if len(tokens[i][1]) == 1 and not seconds and not suffix:
+        return None
+    return end
+
+# find all times of day in a text in a single pass over its tokens
+def iter_times_in_text(text):
+    tokens = tokenize_text(text)
+    i = 0
+    while i < len(tokens):
+        end = _match_time(text, tokens, i)
+        if end is None:
+            i += 1
+        else:
+            yield text[tokens[i][2]:tokens[end][3]]
+            i = end + 1
+
+
+
 ### TIME
-def find_timestamp(text_pages):
+def find_timestamp(text_pages, budget=DETECTION_BUDGET):
     print("\n[i] Searching for Timestamps...")
     hits = {}
-    # \b([01][0-9]|2[0-3]):([0-5][0-9])\b
-    match_pattern = r"\b([0-1]?[0-9]|2[0-3]):[0-5][0-9]\b"
+    # hh:mm and hh:mm:ss, single digit hours only with seconds or am/pm/Uhr suffix
     for i, page in enumerate(text_pages):
-        match = re.findall(match_pattern, page)
+        match = list(within_budget(iter_times_in_text(page), budget, "Timestamp", i))
         hits[i] = match
         print(f" |  Found {len(match)} Timestamp{'' if len(match)==1 else 's'} on Page {i+1}: {', '.join(str(p) for p in match)}")
 
     return hits  
 
-def redact_timestamp(pdf_document, hits, config):
+def redact_timestamp(pdf_document, hits, config, rect_index=None):
     if len(hits) > 0:
         print("\n[i] Redacting Timestamps...\n")
         for page_num in tqdm(range(len(pdf_document)), desc="[i] Redacting Pages", unit="page"):
+            if not hits[page_num]:
+                continue
             page = pdf_document.load_page(page_num)
-            rect_list = []
-            for match in hits[page_num]:
-                    rect_list.extend(page.search_for(match))
-                    # for every phone number found, add redaction
-                    for rect in rect_list:
-
-                        fill_color = hex_to_rgb(config.color_hex) if config.color_hex else COLOR_MAP[config.color]
-                        text_fill_color = hex_to_rgb(config.text_color_hex) if config.text_color_hex else COLOR_MAP[config.text_color]
-
-                        annots = page.add_redact_annot(quad=rect, text=config.text, text_color=text_fill_color, fill=fill_color, cross_out=True)
-
-                        if config.preview:
-                            preview_redactions(page, annots)
-                        else:
-                            # apply redactions to page    
-                            page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE)
+            rect_list = search_page(page, hits[page_num])
+            redact_rects(page, rect_list, config, rect_index)
     else:
          print("\n[i] No Timestamp found.\n")
 
 
 
 ### DATE
-def find_date(text_pages):
+def find_date(text_pages, locales=None, budget=DETECTION_BUDGET):
     print("\n[i] Searching for Dates...")
     hits = {}
 
-    # this regex pattern matches all kinds of dates in dd/mm/yyyy format, seperators include "/.-"
-    # it also matches english and german abbreviations for the written out months.
-    # e.g. 10/5/2023, 12.1.2000, 10 Aug 2033, 7. Januar 2018
-    # check https://regex101.com/r/T2lC8l/1
-    match_pattern = r"((?:[0]?[1-9]|[12][0-9]|3[01])(?:.?)(?:[./-]|[' '])(?:0?[1-9]|1[0-2]|Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?|Jan(?:uar)?|Feb(?:uar)?|Mär(?:z)?|Apr(?:il)?|Mai|Jun(?:i)?|Jul(?:i)?|Aug(?:ust)?|Sep(?:tember)?|Okt(?:ober)?|Nov(?:ember)?|Dez(?:ember)?)(?:[./-]|[' '])(?:[0-9]{4}|[0-9]{2}))"
+    # matches dates with numeric or written out months of all locales in MONTH_NAMES, calendar values are validated
+    # e.g. 10/5/2023, 12.1.2000, 10 Aug 2033, 7. Januar 2018, 2023-05-10, August 10th, 2033
+    month_table = build_month_table(locales) if locales else MONTH_TABLE
 
     for i, page in enumerate(text_pages):
-        match = re.findall(match_pattern, page)
+        match = list(within_budget(iter_dates_in_text(page, month_table), budget, "Date", i))
         hits[i] = match
         print(f" |  Found {len(match)} Date{'' if len(match)==1 else 's'} on Page {i+1}: {', '.join(str(p) for p in match)}")
 
     return hits  
 
-def redact_date(pdf_document, hits, config):
+def redact_date(pdf_document, hits, config, rect_index=None):
     if len(hits) > 0:
         print("\n[i] Redacting Dates...\n")
         for page_num in tqdm(range(len(pdf_document)), desc="[i] Redacting Pages", unit="page"):
+            if not hits[page_num]:
+                continue
             page = pdf_document.load_page(page_num)
-            rect_list = []
-            for match in hits[page_num]:
-                    rect_list.extend(page.search_for(match))
-                    # for every phone number found, add redaction
-                    for rect in rect_list:
-                        
-                        fill_color = hex_to_rgb(config.color_hex) if config.color_hex else COLOR_MAP[config.color]
-                        text_fill_color = hex_to_rgb(config.text_color_hex) if config.text_color_hex else COLOR_MAP[config.text_color]
-
-                        annots = page.add_redact_annot(quad=rect, text=config.text, text_color=text_fill_color, fill=fill_color, cross_out=True)
-                        
-                        if config.preview:
-                            preview_redactions(page, annots)
-                        else:
-                            # apply redactions to page    
-                            page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE)
+            rect_list = search_page(page, hits[page_num])
+            redact_rects(page, rect_list, config, rect_index)
     else:
          print("\n[i] No Date found.\n")
 
 
 ### BAR/QRCODES
-def find_codes(pdf_document, code_type=None):
+
+# render zoom of code scanning (3 = 216 dpi)
+CODE_ZOOM = 3
+# max edge length of a rendered tile in pixels, this bounds the memory of code scanning per page
+CODE_TILE_SIZE = 3072
+# overlap of neighbouring tiles in PDF points, codes up to this size are always fully contained in one tile
+CODE_TILE_OVERLAP = 216
+# zoom of the low resolution render that locates candidate code regions (0.75 = 54 dpi)
+CODE_SCOUT_ZOOM = 0.75
+# window in PDF points over which ink and edge densities are measured
+CODE_SCOUT_WINDOW = 9
+# min share of ink (relative to the local contrast) and of edge pixels in a candidate region
+CODE_MIN_INK = 0.4
+CODE_MIN_EDGES = 0.3
+# min edge length of a candidate region in PDF points
+CODE_MIN_SIZE = 12
+# margin added around a candidate region for the quiet zone, in PDF points plus a share of the region size
+CODE_CANDIDATE_MARGIN = 12
+CODE_CANDIDATE_MARGIN_SHARE = 0.25
+
+# split rect into overlapping tiles of at most size x size points
+def code_tiles(rect, size, overlap):
+    step = size - overlap
+
+    def starts(start, end):
+        positions = [start]
+        while positions[-1] + size < end:
+            positions.append(positions[-1] + step)
+        return positions
+
+    return [fitz.Rect(x, y, min(x + size, rect.x1), min(y + size, rect.y1))
+            for y in starts(rect.y0, rect.y1) for x in starts(rect.x0, rect.x1)]
+
+# decode all codes in a clip of the page, returns (type, data, bbox) with bbox in PDF coords
+def decode_clip(page, clip, zoom=CODE_ZOOM):
+    # zbar works on 8 bit grayscale, which is passed to it directly instead of going through a PIL image
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, clip=clip)
+
+    codes = []
+    for bar in decode((pix.samples, pix.width, pix.height)):
+        r = bar.rect
+        # convert code coords to PDF coords
+        bbox = fitz.Rect(clip.x0 + r.left / zoom, clip.y0 + r.top / zoom,
+                         clip.x0 + (r.left + r.width) / zoom, clip.y0 + (r.top + r.height) / zoom)
+        codes.append((bar.type, bar.data, bbox))
+    return codes
+
+# add codes to the list of codes of a page, a code found again in an overlapping tile is merged with its first sighting
+def merge_codes(page_codes, codes):
+    for code_type, data, bbox in codes:
+        for k, (known_type, known_data, known_bbox) in enumerate(page_codes):
+            if known_type == code_type and known_data == data and known_bbox.intersects(bbox):
+                page_codes[k] = (known_type, known_data, known_bbox | bbox)
+                break
+        else:
+            page_codes.append((code_type, data, bbox))
+
+# merge overlapping rects into their union
+def merge_overlapping(rects):
+    merged = []
+    for rect in rects:
+        i = 0
+        while i < len(merged):
+            if merged[i].intersects(rect):
+                rect = rect | merged.pop(i)
+                i = 0
+            else:
+                i += 1
+        merged.append(rect)
+    return merged
+
+def code_candidates(page, zoom=CODE_SCOUT_ZOOM):
+    """
+    Finds the regions of a page that may contain a code on a low resolution grayscale render.
+    Codes are dense in ink and edges over their whole area, while running text is too sparse and is dropped,
+    so plain text pages yield no candidates. Returns the candidate regions in PDF coords, padded by a quiet zone.
+    """
+    rect = page.rect
+    # the scout render of oversized pages is bounded like a tile
+    zoom = min(zoom, CODE_TILE_SIZE / max(rect.width, rect.height))
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY)
+    ink = 255 - np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.stride)[:, :pix.width]
+
+    window = max(3, round(CODE_SCOUT_WINDOW * zoom))
+    kernel = np.ones((window, window), np.uint8)
+    # ink relative to the darkest pixel around, so light gray codes count like black ones
+    density = cv2.blur(ink, (window, window)).astype(np.float32) / np.maximum(cv2.dilate(ink, kernel), 64)
+    gx = cv2.Sobel(ink, cv2.CV_32F, 1, 0)
+    gy = cv2.Sobel(ink, cv2.CV_32F, 0, 1)
+    edges = cv2.blur(((np.abs(gx) > 60) | (np.abs(gy) > 60)).astype(np.float32), (window, window))
+
+    mask = ((density > CODE_MIN_INK) & (edges > CODE_MIN_EDGES)).astype(np.uint8)
+    # close small gaps only, so neighbouring text lines are not bridged into one region
+    gap = max(3, window // 2)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, np.ones((gap, gap), np.uint8))
+
+    candidates = []
+    _, _, stats, _ = cv2.connectedComponentsWithStats(mask)
+    for x, y, w, h, _ in stats[1:]:
+        if min(w, h) < CODE_MIN_SIZE * zoom:
+            continue
+        region = fitz.Rect(rect.x0 + x / zoom, rect.y0 + y / zoom, rect.x0 + (x + w) / zoom, rect.y0 + (y + h) / zoom)
+        margin = CODE_CANDIDATE_MARGIN + CODE_CANDIDATE_MARGIN_SHARE * max(region.width, region.height)
+        region = (region + (-margin, -margin, margin, margin)) & rect
+        candidates.append(region)
+    return merge_overlapping(candidates)
+
+# decode all codes of a page tile by tile, with prefilter only the candidate regions are decoded
+def decode_page_codes(page, zoom=CODE_ZOOM, tile_size=CODE_TILE_SIZE, overlap=CODE_TILE_OVERLAP, prefilter=True):
+    page_codes = []
+    for region in (code_candidates(page) if prefilter else [page.rect]):
+        for tile in code_tiles(region, tile_size / zoom, overlap):
+            merge_codes(page_codes, decode_clip(page, tile, zoom))
+    return page_codes
+
+def find_codes(pdf_document, code_type=None, pages=None, prefilter=True):
     """
     Helper function to find codes (barcodes or QR codes) in the PDF.
     If code_type is 'barcode', returns only barcodes (not QR codes).
     If code_type is 'qrcode', returns only QR codes.
+    If pages is given, only these page numbers are scanned.
+    Pages are rendered in overlapping tiles, so memory stays bounded on oversized pages.
+    With prefilter, only candidate regions found by code_candidates are decoded and pages without any are skipped.
     """
     print_type = "Barcodes" if code_type == "barcode" else "QR Codes"
 
@@ -488,48 +1335,32 @@ def find_codes(pdf_document, code_type=None):
 
     annotations = []
     
-    for i, page in enumerate(pdf_document):
-        zoom = 3
-        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csRGB)
-        pil_img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+    for i in (range(len(pdf_document)) if pages is None else pages):
+        page = pdf_document.load_page(i)
 
         counter = 0
 
-        for bar in decode(pil_img):
-            if code_type == "barcode" and bar.type.startswith("QRCODE"):
+        for bar_type, _, bbox in decode_page_codes(page, prefilter=prefilter):
+            if code_type == "barcode" and bar_type.startswith("QRCODE"):
                 continue
-            if code_type == "qrcode" and not bar.type.startswith("QRCODE"):
+            if code_type == "qrcode" and not bar_type.startswith("QRCODE"):
                 continue
 
             counter += 1
-
-            # code coords
-            r = bar.rect
-
-            # rect coords
-            x_px, y_px, w_px, h_px = r.left, r.top, r.width, r.height
-
-            # convert code coords to PDF coords
-            x0 = x_px / zoom
-            y0 = y_px / zoom
-            x1 = (x_px + w_px) / zoom
-            y1 = (y_px + h_px) / zoom
-            bbox = fitz.Rect(x0, y0, x1, y1)
-
             annotations.append((i, bbox))
         print(f" |  Found {counter} {print_type[:-1]}{'' if counter == 1 else 's'} on Page {i+1}")
 
     return annotations
 
 
-def find_qrcode(pdf_document):
-    return find_codes(pdf_document, code_type="qrcode")
+def find_qrcode(pdf_document, pages=None, prefilter=True):
+    return find_codes(pdf_document, code_type="qrcode", pages=pages, prefilter=prefilter)
 
-def find_barcode(pdf_document):
-    return find_codes(pdf_document, code_type="barcode")
+def find_barcode(pdf_document, pages=None, prefilter=True):
+    return find_codes(pdf_document, code_type="barcode", pages=pages, prefilter=prefilter)
 
 
-def redact_code(pdf_document, annotations, config):
+def redact_code(pdf_document, annotations, config, rect_index=None):
     if len(annotations) > 0:
         print("\n[i] Redacting Codes...\n")
 
@@ -543,17 +1374,7 @@ def redact_code(pdf_document, annotations, config):
         for page_num in tqdm(range(len(pdf_document)), desc="[i] Redacting Pages", unit="page"):
             if page_num in bbox_map:
                 page = pdf_document.load_page(page_num)
-                for bbox in bbox_map[page_num]:
-
-                    fill_color = hex_to_rgb(config.color_hex) if config.color_hex else COLOR_MAP[config.color]
-                    text_fill_color = hex_to_rgb(config.text_color_hex) if config.text_color_hex else COLOR_MAP[config.text_color]
-
-
-                    annots = page.add_redact_annot(bbox, text=config.text, text_color=text_fill_color, fill=fill_color, cross_out=True)
-                    if config.preview:
-                        preview_redactions(page, annots)
-                    else:
-                        page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE)
+                redact_rects(page, bbox_map[page_num], config, rect_index)
     else:
         print("\n[i] No Codes found.\n")
 
@@ -587,58 +1408,828 @@ def preview_redactions(page, annots):
         
 
 
-def run_redaction(file_path, text_pages, pdf_document, config):
+### PAGE CACHE
+
+# default number of pages kept in the page cache
+PAGE_CACHE_SIZE = 10000
+
+class PageCache:
+    """
+    Batch scoped LRU cache of the redaction rects (and matched value hashes) of pages, keyed by page fingerprint.
+    Repeated template pages (letterheads, terms and conditions, cover sheets) are detected and located only once per batch.
+    """
+    def __init__(self, max_entries=PAGE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, fingerprint):
+        entry = self._entries.get(fingerprint)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(fingerprint)
+        self.hits += 1
+        return entry
+
+    def put(self, fingerprint, entry):
+        self._entries[fingerprint] = entry
+        self._entries.move_to_end(fingerprint)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+# hash of everything the detectors depend on: the text layer and its geometry, links and (for code scanning) the page content
+# the geometry is that of every word (page.get_text("words"), extracted if not given), the cached rects of a match
+# must only be reused where the matched words are at the same position
+def page_fingerprint(page, text, config, words=None):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((tuple(page.rect), page.rotation)).encode())
+    h.update(text.encode("utf-8", "surrogatepass"))
+    if words is None:
+        words = page.get_text("words")
+    for word in words:
+        h.update(repr(word[:5]).encode("utf-8", "surrogatepass"))
+    if config.link:
+        h.update(repr([(tuple(link["from"]), link.get("uri")) for link in page.get_links()]).encode())
+    if config.barcode or config.qrcode:
+        h.update(page.read_contents())
+        for image in page.get_image_info(hashes=True):
+            h.update(repr(image["bbox"]).encode())
+            h.update(image["digest"])
+    return h.digest()
+
+
+
+### VERIFICATION
+
+# rolling hash used to prefilter the windows of a page text before comparing their sha256
+VERIFY_HASH_BASE = 257
+VERIFY_HASH_MOD = (1 << 61) - 1
+
+# "x on page(s) 1, 2" part of the messages below
+def pages_message(text, pages):
+    return f"{text} on page{'' if len(pages)==1 else 's'} {', '.join(str(page_num + 1) for page_num in sorted(pages))}"
+
+# message about the text spans ({page_num: [(start, end)]}) no detector saw
+def unscanned_message(unscanned):
+    chars = sum(end - start for spans in unscanned.values() for start, end in spans)
+    return pages_message(f"{chars} character{'' if chars==1 else 's'} not scanned by regex masks", unscanned)
+
+class IncompleteScanError(Exception):
+    """
+    Raised when parts of the text of a saved document were not scanned by all detectors.
+    unscanned maps page numbers to the skipped (start, end) text spans.
+    """
+    status = "incomplete"
+
+    def __init__(self, file_path, unscanned):
+        self.file_path = file_path
+        self.unscanned = unscanned
+        super().__init__(unscanned_message(unscanned))
+
+class VerificationError(Exception):
+    """
+    Raised when matched values are still found in the text of a saved document, or parts of its text were not scanned.
+    file_path is the path the output was moved to (<name>.unverified.pdf).
+    failures maps page numbers to the number of distinct leftover values, unscanned as for IncompleteScanError.
+    """
+    status = "unverified"
+
+    def __init__(self, file_path, failures, unscanned=None):
+        self.file_path = file_path
+        self.failures = failures
+        self.unscanned = unscanned or {}
+        messages = []
+        if failures:
+            total = sum(failures.values())
+            messages.append(pages_message(f"{total} matched value{'' if total==1 else 's'} left", failures))
+        if self.unscanned:
+            messages.append(unscanned_message(self.unscanned))
+        super().__init__("; ".join(messages))
+
+# case and whitespace insensitive form of a text, as compared by the verification
+def normalize_value(text):
+    return " ".join(text.casefold().split())
+
+def rolling_hash(text):
+    h = 0
+    for c in text:
+        h = (h * VERIFY_HASH_BASE + ord(c)) % VERIFY_HASH_MOD
+    return h
+
+# (length, rolling hash, sha256) of a matched value, the value itself is not kept
+def value_hash(value):
+    value = normalize_value(value)
+    return (len(value), rolling_hash(value), hashlib.sha256(value.encode("utf-8", "surrogatepass")).hexdigest())
+
+# add the hashes of detector hits ({page_num: [matches]}) to match_hashes ({page_num: set of value hashes})
+def record_match_hashes(match_hashes, hits):
+    if match_hashes is None:
+        return
+    for page_num, matches in hits.items():
+        hashes = {value_hash(match) for match in matches if match.strip()}
+        if hashes:
+            match_hashes.setdefault(page_num, set()).update(hashes)
+
+# positions a matched value can start at: the start of a word or a punctuation character, never inside a word
+# (all detectors match on word boundaries) or on whitespace (values are normalized)
+VERIFY_START_PATTERN = re.compile(r"(?<!\w)\w|[^\w\s]")
+
+# value hashes of which a window of the text has the same length, rolling hash and sha256 (Rabin-Karp)
+def find_leftover_hashes(text, hashes):
+    text = normalize_value(text)
+    by_length = {}
+    for length, rolling, digest in hashes:
+        by_length.setdefault(length, {}).setdefault(rolling, set()).add(digest)
+    if not by_length:
+        return set()
+
+    # prefix hashes, the rolling hash of text[i:j] is prefix[j] - prefix[i] * base^(j-i), so every window is O(1)
+    prefix = [0]
+    for c in text:
+        prefix.append((prefix[-1] * VERIFY_HASH_BASE + ord(c)) % VERIFY_HASH_MOD)
+    starts = [m.start() for m in VERIFY_START_PATTERN.finditer(text)]
+
+    found = set()
+    modulus = VERIFY_HASH_MOD
+    for length, candidates in by_length.items():
+        power = pow(VERIFY_HASH_BASE, length, modulus)
+        # windows must end within the text
+        last = bisect.bisect_right(starts, len(text) - length)
+        for i in [i for i in starts[:last] if (prefix[i+length] - prefix[i] * power) % modulus in candidates]:
+            h = (prefix[i+length] - prefix[i] * power) % modulus
+            digest = hashlib.sha256(text[i:i+length].encode("utf-8", "surrogatepass")).hexdigest()
+            if digest in candidates[h]:
+                found.add((length, h, digest))
+    return found
+
+def verify_redactions(saved_path, match_hashes):
+    """
+    Reopens a saved document and re-extracts the text of the pages with matches only,
+    checking it for leftover occurrences of the matched values.
+    Returns the number of distinct leftover values per failed page: {page_num: count}
+    """
+    pages = sorted(page_num for page_num, hashes in match_hashes.items() if hashes)
+    print(f"\n[i] Verifying {len(pages)} redacted Page{'' if len(pages)==1 else 's'} of '{saved_path}'...")
+
+    failures = {}
+    pdf_document = fitz.open(saved_path)
+    try:
+        for page_num in pages:
+            leftovers = find_leftover_hashes(pdf_document.load_page(page_num).get_text("text"), match_hashes[page_num])
+            if leftovers:
+                failures[page_num] = len(leftovers)
+                print(f" |  Found {len(leftovers)} matched value{'' if len(leftovers)==1 else 's'} left on Page {page_num+1}")
+    finally:
+        pdf_document.close()
+    return failures
+
+
+
+def run_redaction(file_path, text_pages, pdf_document, config, page_cache=None, match_hashes=None, unscanned=None):
     print(f"[i] Analysing file '{file_path}'\n")
 
-    # load pdf and ocr
-    pdf_document = load_pdf(file_path)
-    text_pages = ocr_pdf(pdf_document)
+    # config may be a RedactorConfig or an already compiled RedactionPolicy
+    config = compile_policy(config)
+    # hashes of the matched values of every page are collected in match_hashes, if given, for verify_redactions,
+    # and text spans no detector saw in unscanned
+    page_hashes = {}
+    page_unscanned = {}
+
+    # load pdf and ocr, unless already done by the caller
+    if pdf_document is None:
+        pdf_document = load_pdf(file_path)
+    word_pages = None
+    if text_pages is None:
+        if page_cache is not None:
+            text_pages, word_pages = ocr_pdf(pdf_document, with_words=True)
+        else:
+            text_pages = ocr_pdf(pdf_document)
+    budget = config.detection_budget
     
+    # rects of all detectors are collected per page, merged and redacted in one go
+    rect_index = {}
+
+    # pages found in the page cache, or repeating an earlier page of this document, skip detection
+    fingerprints = {}
+    reused = {}
+    if page_cache is not None:
+        first_pages = {}
+        for page_num in range(len(pdf_document)):
+            words = word_pages[page_num] if word_pages is not None else None
+            fingerprint = page_fingerprint(pdf_document.load_page(page_num), text_pages[page_num], config, words)
+            if fingerprint in first_pages:
+                reused[page_num] = first_pages[fingerprint]
+                continue
+            cached_entry = page_cache.get(fingerprint)
+            if cached_entry is not None:
+                reused[page_num] = cached_entry
+            else:
+                first_pages[fingerprint] = page_num
+                fingerprints[page_num] = fingerprint
+
+        if reused:
+            print(f"[i] Reusing cached results for {len(reused)} of {len(pdf_document)} Page{'' if len(pdf_document)==1 else 's'}\n")
+            text_pages = ["" if page_num in reused else text for page_num, text in enumerate(text_pages)]
+    pages = [page_num for page_num in range(len(pdf_document)) if page_num not in reused]
+
     if config.phonenumber:
-        all_phone_numbers = find_phone_numbers(text_pages, config)
-        redact_phone_numbers(pdf_document, all_phone_numbers, config)
+        all_phone_numbers = find_phone_numbers(text_pages, config, budget)
+        record_match_hashes(page_hashes, all_phone_numbers)
+        redact_phone_numbers(pdf_document, all_phone_numbers, config, rect_index)
 
     if config.link:
-        redact_links(pdf_document, config)
+        redact_links(pdf_document, config, rect_index, pages)
 
     if config.email:  
-        emails = find_email_addresses(text_pages)
-        redact_email_adresses(pdf_document, emails, config)
+        emails = find_email_addresses(text_pages, budget)
+        record_match_hashes(page_hashes, emails)
+        redact_email_adresses(pdf_document, emails, config, rect_index)
     
     if config.mask:
-        hits = find_custom_mask(text_pages, config.mask)
-        redact_custom_mask(pdf_document, hits, config)
+        # only user supplied regexes can backtrack, the other detectors see the whole text
+        mask_pages = guard_text_pages(text_pages, page_unscanned) if config.mask_regex else text_pages
+        hits = find_custom_mask(mask_pages, config.mask, config.mask_regex, budget, config.mask_pattern, page_unscanned)
+        record_match_hashes(page_hashes, hits)
+        redact_custom_mask(pdf_document, hits, config, rect_index)
     
     if config.iban:
-        ibans = find_ibans(text_pages)
-        redact_ibans(pdf_document, ibans, config)
+        ibans = find_ibans(text_pages, budget)
+        record_match_hashes(page_hashes, ibans)
+        redact_ibans(pdf_document, ibans, config, rect_index)
 
     if config.bic:
-        bics = find_bics(text_pages)
-        redact_bics(pdf_document, bics, config)
+        bics = find_bics(text_pages, config.bic_registry_codes, budget, config.bic_strict)
+        record_match_hashes(page_hashes, bics)
+        redact_bics(pdf_document, bics, config, rect_index)
 
     if config.timestamp:
-        timestamps = find_timestamp(text_pages)
-        redact_timestamp(pdf_document, timestamps, config)
+        timestamps = find_timestamp(text_pages, budget)
+        record_match_hashes(page_hashes, timestamps)
+        redact_timestamp(pdf_document, timestamps, config, rect_index)
 
     if config.date:
-        dates = find_date(text_pages)
-        redact_date(pdf_document, dates, config)
+        dates = find_date(text_pages, budget=budget)
+        record_match_hashes(page_hashes, dates)
+        redact_date(pdf_document, dates, config, rect_index)
     
     if config.barcode:
-        barcodes = find_barcode(pdf_document)
-        redact_code(pdf_document, barcodes, config)
+        barcodes = find_barcode(pdf_document, pages, config.code_prefilter)
+        redact_code(pdf_document, barcodes, config, rect_index)
 
     if config.qrcode:
-        qrcodes = find_qrcode(pdf_document)
-        redact_code(pdf_document, qrcodes, config)
+        qrcodes = find_qrcode(pdf_document, pages, config.code_prefilter)
+        redact_code(pdf_document, qrcodes, config, rect_index)
+
+    if page_cache is not None:
+        # store the merged rects, value hashes and unscanned spans of every detected page, and copy them to the reused pages
+        page_entries = {page_num: (tuple(tuple(rect) for rect in rect_index[page_num].rects()) if page_num in rect_index else (),
+                                   frozenset(page_hashes.get(page_num, ())),
+                                   tuple(page_unscanned.get(page_num, ())))
+                        for page_num in fingerprints}
+        for page_num, fingerprint in fingerprints.items():
+            page_cache.put(fingerprint, page_entries[page_num])
+        for page_num, source in reused.items():
+            rects, hashes, spans = page_entries[source] if isinstance(source, int) else source
+            if hashes:
+                page_hashes[page_num] = set(hashes)
+            if spans:
+                page_unscanned[page_num] = list(spans)
+            if rects:
+                page_index = rect_index.setdefault(page_num, PageRectIndex())
+                for rect in rects:
+                    page_index.add(rect)
+
+    apply_rect_index(pdf_document, rect_index, config)
+    if match_hashes is not None:
+        match_hashes.update(page_hashes)
+    if unscanned is not None:
+        unscanned.update(page_unscanned)
 
     return pdf_document
 
 
 
+### SCAN ONLY
+def scan_pdf(file_path, config, report_path=None):
+    """
+    Runs text extraction and the enabled text detectors only, nothing is located, rendered, redacted or saved.
+    Per-page hit counts are appended to the csv report at report_path, if given.
+    Returns the hit counts per page: {page_num: {category: count}}
+    """
+    print(f"[i] Scanning file '{file_path}'\n")
+
+    config = compile_policy(config)
+
+    pdf_document = load_pdf(file_path)
+    text_pages = ocr_pdf(pdf_document)
+    budget = config.detection_budget
+
+    hits = {}
+    if config.phonenumber:
+        hits["Phone Numbers"] = find_phone_numbers(text_pages, config, budget)
+    if config.link:
+        hits["Links"] = find_links(pdf_document)
+    if config.email:
+        hits["Email Addresses"] = find_email_addresses(text_pages, budget)
+    if config.mask:
+        mask_pages = guard_text_pages(text_pages) if config.mask_regex else text_pages
+        hits["Custom Mask"] = find_custom_mask(mask_pages, config.mask, config.mask_regex, budget, config.mask_pattern)
+    if config.iban:
+        hits["IBANs"] = find_ibans(text_pages, budget)
+    if config.bic:
+        hits["BICs"] = find_bics(text_pages, config.bic_registry_codes, budget, config.bic_strict)
+    if config.timestamp:
+        hits["Timestamps"] = find_timestamp(text_pages, budget)
+    if config.date:
+        hits["Dates"] = find_date(text_pages, budget=budget)
+    if config.barcode or config.qrcode:
+        print("\n[i] Skipping Barcodes/QR Codes, scanning for them requires rendering.")
+
+    page_counts = {}
+    for page_num in range(len(pdf_document)):
+        counts = {category: len(page_hits[page_num]) for category, page_hits in hits.items() if page_hits[page_num]}
+        if counts:
+            page_counts[page_num] = counts
+
+    pdf_document.close()
+
+    print_scan_results(file_path, page_counts)
+    if report_path:
+        write_scan_report(report_path, file_path, page_counts)
+
+    return page_counts
+
+def print_scan_results(file_path, page_counts):
+    total = sum(sum(counts.values()) for counts in page_counts.values())
+    print(f"\n[i] Scan results for '{file_path}': {total} hit{'' if total==1 else 's'} on {len(page_counts)} page{'' if len(page_counts)==1 else 's'}")
+    for page_num, counts in sorted(page_counts.items()):
+        print(f" |  Page {page_num+1}: {', '.join(f'{count} {category}' for category, count in counts.items())}")
+
+# append per-page hit counts to a csv report (file, page, category, count)
+def write_scan_report(report_path, file_path, page_counts):
+    write_header = not os.path.exists(report_path)
+    with open(report_path, "a", newline="") as f:
+        writer = csv.writer(f)
+        if write_header:
+            writer.writerow(["file", "page", "category", "count"])
+        # files without any hit get a single row, so the report covers every scanned file
+        if not page_counts:
+            writer.writerow([file_path, "", "", 0])
+        for page_num, counts in sorted(page_counts.items()):
+            for category, count in counts.items():
+                writer.writerow([file_path, page_num+1, category, count])
+
+# append a row for a file that could not be scanned to the csv report
+def write_scan_error(report_path, file_path, error):
+    write_header = not os.path.exists(report_path)
+    with open(report_path, "a", newline="") as f:
+        writer = csv.writer(f)
+        if write_header:
+            writer.writerow(["file", "page", "category", "count"])
+        writer.writerow([file_path, "", f"Error: {error}", ""])
+
+
+
+
+### BATCH RUNS
+
+# default file name of the journal of a batch run, kept in the output (or input) directory
+JOURNAL_FILENAME = ".pdf_redactor_journal.jsonl"
+# default file name of the journal of a scan-only run, kept next to the scan report (or in the input directory)
+SCAN_JOURNAL_FILENAME = ".pdf_redactor_scan_journal.jsonl"
+
+def _matches_any(name, rel_path, patterns):
+    return any(fnmatch.fnmatch(name.lower(), pattern.lower()) or fnmatch.fnmatch(rel_path.lower(), pattern.lower()) for pattern in patterns)
+
+# find all pdf files in directory (and its subdirectories if recursive), largest files first
+# include/exclude are glob patterns matched against the file name and the path relative to directory
+def discover_pdfs(directory, recursive=False, include=None, exclude=None):
+    found = []
+    stack = [directory]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            stack.append(entry.path)
+                        continue
+                    if not entry.is_file() or not entry.name.lower().endswith('.pdf'):
+                        continue
+                    rel_path = os.path.relpath(entry.path, directory).replace(os.sep, "/")
+                    if include and not _matches_any(entry.name, rel_path, include):
+                        continue
+                    if exclude and _matches_any(entry.name, rel_path, exclude):
+                        continue
+                    found.append((entry.stat().st_size, entry.path))
+        except OSError as e:
+            print(f"[Error] Could not read directory '{current}': {e}")
+
+    found.sort(key=lambda item: (-item[0], item[1]))
+    return [file_path for _, file_path in found]
+
+# output path of a file found in input_dir, subdirectories are mirrored in output_dir
+def redacted_file_path(file_path, input_dir, output_dir=None):
+    rel_path = os.path.relpath(file_path, input_dir)
+    return os.path.join(output_dir or input_dir, "{0}_{2}{1}".format(*os.path.splitext(rel_path) + ("redacted",)))
+
+def file_sha256(file_path):
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+class BatchJournal:
+    """
+    Append-only journal (JSON lines) of the files completed in a batch run, with the hashes of their outputs.
+    A file counts as done as long as it has not changed since and its output (if any, scans have none) still exists.
+    """
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.entries = {}
+        if os.path.exists(file_path):
+            with open(file_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # last line of an interrupted run
+                        continue
+                    self.entries[entry["input"]] = entry
+
+    def is_done(self, file_path):
+        entry = self.entries.get(os.path.abspath(file_path))
+        if entry is None:
+            return False
+        stat = os.stat(file_path)
+        return entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns and \
+            (entry["output"] is None or os.path.exists(entry["output"]))
+
+    # skip the done files, as for --resume
+    def remaining(self, files):
+        remaining = [file_path for file_path in files if not self.is_done(file_path)]
+        print(f"[i] Resuming: skipping {len(files) - len(remaining)} of {len(files)} completed file{'' if len(files)==1 else 's'}\n")
+        return remaining
+
+    def record(self, file_path, out_path=None):
+        stat = os.stat(file_path)
+        entry = {
+            "input": os.path.abspath(file_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "output": os.path.abspath(out_path) if out_path else None,
+            "sha256": file_sha256(out_path) if out_path else None,
+            "completed": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        with open(self.file_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.entries[entry["input"]] = entry
+
+# redact a single file and save it to out_path, returns the path the file was saved to
+def process_file(file_path, out_path, config, page_cache=None, relative_to_script=False, profile_dir=None):
+    if profile_dir:
+        return profile_call(profile_path(profile_dir, file_path), process_file, file_path, out_path, config, page_cache, relative_to_script)
+
+    match_hashes = {}
+    unscanned = {}
+    pdf_document = run_redaction(file_path, None, None, config, page_cache, match_hashes, unscanned)
+    try:
+        if relative_to_script:
+            saved_path = save_redactions_to_file(pdf_document, out_path)
+        else:
+            out_dir = os.path.dirname(out_path)
+            if out_dir:
+                os.makedirs(out_dir, exist_ok=True)
+            saved_path = save_redactions_to_relative_file(pdf_document, out_path)
+    finally:
+        pdf_document.close()
+
+    # previews apply the redactions the user accepts, declined ones are left in the output and fail the verification
+    policy = compile_policy(config)
+    if policy.verify:
+        failures = verify_redactions(saved_path, match_hashes)
+        # text that was never scanned cannot be verified
+        if failures or unscanned:
+            # the output must not pass for a verified one, it is moved to <name>.unverified.pdf
+            unverified_path = "{0}.unverified{1}".format(*os.path.splitext(saved_path))
+            os.replace(saved_path, unverified_path)
+            print(f" |  Verification failed, output moved to '{unverified_path}'")
+            if failures and policy.preview:
+                print(" |  Redactions declined in the preview are left in the output")
+            raise VerificationError(unverified_path, failures, unscanned)
+        print(" |  Verified, no matched values left")
+    if unscanned:
+        raise IncompleteScanError(saved_path, unscanned)
+    return saved_path
+
+# result of a processed file, as collected in the run report
+def file_result(file_path, status, output=None, seconds=0.0, error=None):
+    return {"input": file_path, "status": status, "output": output, "seconds": round(seconds, 3), "error": error}
+
+# process (file_path, out_path, relative_to_script) tasks one after another in this process
+def run_inline_batch(tasks, config, page_cache=None, on_result=None, profile_dir=None):
+    results = []
+    for file_path, out_path, relative_to_script in tasks:
+        start = time.monotonic()
+        try:
+            saved_path = process_file(file_path, out_path, config, page_cache, relative_to_script, profile_dir)
+            result = file_result(file_path, "ok", saved_path, time.monotonic() - start)
+        except (VerificationError, IncompleteScanError) as e:
+            result = file_result(file_path, e.status, e.file_path, time.monotonic() - start, str(e))
+        except Exception as e:
+            result = file_result(file_path, "error", seconds=time.monotonic() - start, error=f"{type(e).__name__}: {e}")
+        results.append(result)
+        if on_result:
+            on_result(result)
+    return results
+
+
+
+### ISOLATED BATCH PROCESSING
+
+# default wall-clock limit of a single file in seconds (0 = no limit)
+FILE_TIMEOUT = 900
+# time a new worker has to report that it is ready, in seconds
+WORKER_START_TIMEOUT = 60
+
+class WorkerStartError(Exception):
+    """
+    Raised when a worker process cannot be started, e.g. in a packaged app that cannot spawn Python processes.
+    Files without a result have not been processed and can be run with run_inline_batch instead.
+    """
+
+# entry point of a worker process: processes the tasks it receives until it gets None
+def _worker_main(conn, policy, page_cache_size, memory_limit, profile_dir=None):
+    if memory_limit and resource is not None:
+        limit = memory_limit * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    page_cache = PageCache(page_cache_size) if page_cache_size > 0 else None
+    conn.send(("ready", None, None))
+
+    while True:
+        task = conn.recv()
+        if task is None:
+            break
+        file_path, out_path, relative_to_script = task
+        try:
+            conn.send(("ok", process_file(file_path, out_path, policy, page_cache, relative_to_script, profile_dir), None))
+        except (VerificationError, IncompleteScanError) as e:
+            conn.send((e.status, e.file_path, str(e)))
+        except Exception as e:
+            conn.send(("error", None, f"{type(e).__name__}: {e}"))
+
+class IsolatedWorker:
+    """
+    Worker process for batch runs. The policy is sent once when the worker starts and reused for all of its files,
+    a worker that hangs or crashes is killed and replaced without affecting the rest of the batch.
+    """
+    def __init__(self, context, policy, page_cache_size, memory_limit, profile_dir=None):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, policy, page_cache_size, memory_limit, profile_dir), daemon=True)
+        try:
+            self.process.start()
+        except Exception as e:
+            raise WorkerStartError(f"Worker process could not be started ({type(e).__name__}: {e})") from e
+        finally:
+            child_conn.close()
+
+        # a worker that does not report back (crashed, or the executable is no Python interpreter) is given up on
+        try:
+            ready = self.conn.poll(WORKER_START_TIMEOUT) and self.conn.recv()[0] == "ready"
+        except (EOFError, OSError):
+            ready = False
+        if not ready:
+            exitcode = self.process.exitcode
+            self.kill()
+            raise WorkerStartError(f"Worker process did not start (exit code {exitcode})")
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def close(self):
+        try:
+            self.conn.send(None)
+            self.process.join(timeout=5)
+        except OSError:
+            pass
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+def run_isolated_batch(tasks, config, workers=1, timeout=FILE_TIMEOUT, memory_limit=None, page_cache_size=PAGE_CACHE_SIZE, on_result=None, profile_dir=None):
+    """
+    Processes (file_path, out_path, relative_to_script) tasks in up to `workers` isolated worker processes.
+    Files failing verification are recorded as unverified, files not fully scanned as incomplete, files exceeding timeout (seconds, 0 = no limit) or memory_limit (MB, not supported on Windows), or crashing
+    their worker, are recorded as failed and the batch continues with a new worker.
+    With profile_dir, every worker writes a profile per file (not for files it was killed on).
+    Raises WorkerStartError if a worker cannot be started, after stopping all other workers.
+    Returns one file_result per task.
+    """
+    # no worker would ever pick up a task, and a negative timeout would kill every worker right away
+    assert workers >= 1, f"workers must be at least 1, got {workers}"
+    assert timeout >= 0, f"timeout must be at least 0, got {timeout}"
+    policy = compile_policy(config)
+    if memory_limit and resource is None:
+        print("[Warning] Memory limits are not supported on this platform, running without.")
+
+    context = multiprocessing.get_context("spawn")
+    pending = list(reversed(tasks))
+    idle = []
+    busy = {}
+    results = []
+
+    def finish(worker, status, output=None, error=None):
+        task, start = busy.pop(worker)
+        result = file_result(task[0], status, output, time.monotonic() - start, error)
+        results.append(result)
+        if on_result:
+            on_result(result)
+
+    while pending or busy:
+        # hand out files to free workers
+        while pending and len(busy) < workers:
+            try:
+                worker = idle.pop() if idle else IsolatedWorker(context, policy, page_cache_size, memory_limit, profile_dir)
+            except WorkerStartError:
+                for worker in list(busy) + idle:
+                    worker.kill()
+                raise
+            task = pending.pop()
+            worker.conn.send(task)
+            busy[worker] = (task, time.monotonic())
+
+        multiprocessing.connection.wait([w.conn for w in busy] + [w.process.sentinel for w in busy], timeout=1)
+
+        now = time.monotonic()
+        for worker in list(busy):
+            task, start = busy[worker]
+            if worker.conn.poll():
+                try:
+                    status, output, error = worker.conn.recv()
+                except EOFError:
+                    finish(worker, "crashed", error=f"Worker exited with code {worker.process.exitcode}")
+                    worker.kill()
+                    continue
+                finish(worker, status, output, error)
+                idle.append(worker)
+            elif not worker.process.is_alive():
+                finish(worker, "crashed", error=f"Worker exited with code {worker.process.exitcode}")
+                worker.kill()
+            elif timeout and now - start > timeout:
+                worker.kill()
+                finish(worker, "timeout", error=f"Exceeded timeout of {timeout}s")
+
+    for worker in idle:
+        worker.close()
+    return results
+
+# tasks without a result, e.g. after a WorkerStartError
+def unfinished_tasks(tasks, results):
+    finished = {result["input"] for result in results}
+    return [task for task in tasks if task[0] not in finished]
+
+# copy a failed file to the quarantine directory, keeping its path relative to input_dir
+def quarantine_file(file_path, input_dir, quarantine_dir):
+    target = os.path.join(quarantine_dir, os.path.relpath(file_path, input_dir))
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    shutil.copy2(file_path, target)
+    return target
+
+# write the results of a batch run to a json report
+def write_run_report(report_path, results):
+    summary = {}
+    for result in results:
+        summary[result["status"]] = summary.get(result["status"], 0) + 1
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump({"files": len(results), "summary": summary, "results": results}, f, indent=2)
+
+def print_run_summary(results):
+    failed = [result for result in results if result["status"] != "ok"]
+    print(f"\n[i] Processed {len(results)} file{'' if len(results)==1 else 's'}: {len(results) - len(failed)} ok, {len(failed)} failed")
+    for result in failed:
+        print(f" |  {result['status']}: '{result['input']}' ({result['error']})")
+
+
+
+### PROFILING
+
+# interval of the stack sampler in seconds and number of functions listed in a profile report
+PROFILE_SAMPLE_INTERVAL = 0.005
+PROFILE_REPORT_LINES = 60
+BATCH_PROFILE_NAME = "batch"
+
+class StackSampler(threading.Thread):
+    """
+    Samples the call stack of another thread at a fixed interval and counts the stacks in the collapsed
+    format of flame graph tools ("outer;inner;innermost count"). Time spent inside PyMuPDF, OpenCV or zbar
+    is attributed to the Python function that called into them. Stacks start below root_frame if given.
+    """
+    def __init__(self, thread_id, root_frame=None, interval=PROFILE_SAMPLE_INTERVAL):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.root_frame = root_frame
+        self.interval = interval
+        self.stacks = {}
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and frame is not self.root_frame:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                key = ";".join(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+# base path (without extension) of the profile of a file, unique for files with the same name in different folders
+def profile_path(profile_dir, file_path):
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    digest = hashlib.sha1(os.path.abspath(file_path).encode()).hexdigest()[:8]
+    return os.path.join(profile_dir, f"{name}-{digest}")
+
+# write <base>.prof (pstats), <base>.txt (sorted by cumulative time) and <base>.folded (collapsed stacks)
+def write_profile(base_path, stats, stacks, title):
+    os.makedirs(os.path.dirname(base_path) or ".", exist_ok=True)
+    stats.dump_stats(base_path + ".prof")
+    with open(base_path + ".txt", "w", encoding="utf-8") as f:
+        f.write(f"Profile of {title}\n\n")
+        stats.stream = f
+        stats.sort_stats("cumulative").print_stats(PROFILE_REPORT_LINES)
+    with open(base_path + ".folded", "w", encoding="utf-8") as f:
+        for stack, count in sorted(stacks.items()):
+            f.write(f"{stack} {count}\n")
+
+# call func(*args) under cProfile and the stack sampler, the profile is written even if func raises
+def profile_call(base_path, func, *args):
+    profiler = cProfile.Profile()
+    sampler = StackSampler(threading.get_ident(), sys._getframe())
+    sampler.start()
+    profiler.enable()
+    try:
+        return func(*args)
+    finally:
+        profiler.disable()
+        sampler.stop()
+        write_profile(base_path, pstats.Stats(profiler), sampler.stacks, args[0] if args else func.__name__)
+
+# combine the profiles written for the given files into one batch profile
+def write_batch_profile(profile_dir, file_paths):
+    bases = [profile_path(profile_dir, file_path) for file_path in file_paths]
+    bases = [base for base in bases if os.path.exists(base + ".prof")]
+    if not bases:
+        return None
+
+    stats = pstats.Stats(bases[0] + ".prof")
+    stacks = {}
+    for base in bases:
+        if base != bases[0]:
+            stats.add(base + ".prof")
+        with open(base + ".folded", encoding="utf-8") as f:
+            for line in f:
+                stack, count = line.rsplit(" ", 1)
+                stacks[stack] = stacks.get(stack, 0) + int(count)
+
+    base_path = os.path.join(profile_dir, BATCH_PROFILE_NAME)
+    write_profile(base_path, stats, stacks, f"{len(bases)} file{'' if len(bases)==1 else 's'}")
+    print(f"\n[i] Profiles of {len(bases)} file{'' if len(bases)==1 else 's'} written to '{profile_dir}', batch report: '{base_path}.txt'")
+    return base_path
+
+
 
 ### MAIN
+# argparse types of numeric options with a lower bound
+def at_least(minimum, number_type=int):
+    def parse(value):
+        number = number_type(value)
+        if number < minimum:
+            raise argparse.ArgumentTypeError(f"must be at least {minimum}, got {value}")
+        return number
+    # named after the number type for argparse's "invalid int value" message
+    parse.__name__ = number_type.__name__
+    return parse
+
+# numeric options with a lower bound
+BOUNDED_OPTIONS = {"workers": at_least(1), "timeout": at_least(0, float), "memory_limit": at_least(1), "page_cache_size": at_least(0)}
+
 def main():
     # print ascii logo
     print_logo()    
@@ -655,49 +2246,129 @@ def main():
     parser.add_argument('-v', '--preview', action='store_true', help='Preview redacted areas before continuing.')
     parser.add_argument('-g', '--geographic-code', type=str, help='Geographic code for phone number detection (e.g. US, GB, FR) for better accuracy.')
     parser.add_argument('-m', '--mask', action='append', type=str, help='Custom Word mask to redact, e.g. "John Doe" (case insensitive). Multiple masks can be specified.')
+    parser.add_argument('--mask-regex', action='store_true', help='Treat custom masks as regular expressions instead of literal text.')
     parser.add_argument('-t', '--text', type=str, default=None, help='Text to show in redacted areas. Default: None.')
     parser.add_argument('-c', '--color', default='black', type=str, help='Fill Color of redacted areas. Default: "black".', choices=list(COLOR_MAP.keys()))
     parser.add_argument('-C', '--text-color', default='white', type=str, help='Fill Color of replacement text. Default: "white".', choices=list(COLOR_MAP.keys()))
-    parser.add_argument('-d', '--date', action='store_true', help='Redact all dates (dd./-mm./-yyyy).')
+    parser.add_argument('-d', '--date', action='store_true', help='Redact all dates (e.g. 10.05.2023, 10 Aug 2023, 2023-05-10).')
     parser.add_argument('-f', '--timestamp', action='store_true', help='Redact all timestamps.')
     parser.add_argument('-s', '--iban', action='store_true', help='Redact all IBANs (International Bank Account Numbers).')
     parser.add_argument('-b', '--bic', action='store_true', help='Redact all BICs (Bank Identifier Codes).')
+    parser.add_argument('--bic-registry', type=str, help='File of known BICs (one per line), only these are redacted as BICs.')
+    parser.add_argument('--bic-strict', action='store_true', help='Only redact BICs made of letters only if a "BIC" or "SWIFT" label is in front of them or an IBAN is next to them.')
     parser.add_argument('-r', '--barcode', action='store_true', help='Redact all Barcodes.')
     parser.add_argument('-q', '--qrcode', action='store_true', help='Redact all QR Codes.')
     parser.add_argument('-x', '--color-hex', type=str, help='Fill color of redacted areas in HEX ("#000000").')
     parser.add_argument('-X', '--text-color-hex', type=str, help='Text color of redacted areas in HEX ("#FFFFFF").')
-
+    parser.add_argument('--detection-budget', type=float, help=f'Time budget of a detector per page in seconds, checked between matches: once it is used up the remaining matches are skipped. Regex masks are only stopped within a match if the regex package is installed. Default: {DETECTION_BUDGET}.')
+    parser.add_argument('--page-cache-size', type=BOUNDED_OPTIONS['page_cache_size'], default=PAGE_CACHE_SIZE, help=f'Number of pages whose detection results are reused for identical pages, 0 disables the cache. Default: {PAGE_CACHE_SIZE}.')
+    parser.add_argument('--scan-only', action='store_true', help='Only detect and report hits per file and page, without redacting or saving.')
+    parser.add_argument('--scan-report', type=str, help='CSV file to append the per-page hit counts of --scan-only to.')
+    parser.add_argument('-R', '--recursive', action='store_true', help='Also process PDF files in subdirectories of the input directory.')
+    parser.add_argument('--include', action='append', type=str, help='Glob pattern of files to process in directory mode, e.g. "invoices/*". Multiple patterns can be specified.')
+    parser.add_argument('--exclude', action='append', type=str, help='Glob pattern of files to skip in directory mode, e.g. "*_redacted.pdf". Multiple patterns can be specified.')
+    parser.add_argument('--journal', type=str, help=f'Journal file of completed files in directory mode. Default: "{JOURNAL_FILENAME}" in the output (or input) directory, "{SCAN_JOURNAL_FILENAME}" next to the scan report (or in the input directory) for --scan-only.')
+    parser.add_argument('--resume', action='store_true', help='Skip files the journal lists as completed.')
+    parser.add_argument('-w', '--workers', type=BOUNDED_OPTIONS['workers'], default=1, help='Number of files processed in parallel in directory mode. Default: 1.')
+    parser.add_argument('--timeout', type=BOUNDED_OPTIONS['timeout'], default=FILE_TIMEOUT, help=f'Wall-clock limit per file in seconds, 0 disables it. Default: {FILE_TIMEOUT}.')
+    parser.add_argument('--memory-limit', type=BOUNDED_OPTIONS['memory_limit'], help='Memory limit per worker in MB (not supported on Windows).')
+    parser.add_argument('--no-isolation', action='store_true', help='Process files in the main process instead of isolated workers.')
+    parser.add_argument('--report', type=str, help='JSON file to write the results of a directory run to.')
+    parser.add_argument('--quarantine', type=str, help='Directory to copy files to that failed, timed out or crashed.')
+    parser.add_argument('--no-code-prefilter', dest='code_prefilter', action='store_false', help='Decode bar/QR codes on the whole page instead of candidate regions only.')
+    parser.add_argument('--verify', action='store_true', help='Check the saved files for leftover matched values on redacted pages.')
+    parser.add_argument('--profile', type=str, help='Directory to write a CPU profile per file (and per batch in directory mode) to.')
+    parser.add_argument('-P', '--policy', type=str, help='TOML or JSON file with default options, flags given on the command line take precedence.')
+
+
+    # options of a policy file become the defaults of the parser
+    known_args, _ = parser.parse_known_args()
+    policy_options = load_policy_file(known_args.policy) if known_args.policy else {}
+    # list options are not set as defaults, argparse would append the values of the command line to them
+    parser.set_defaults(**{name: value for name, value in policy_options.items() if name not in LIST_OPTIONS})
 
     # parse args
     args = parser.parse_args()
+    # list options given on the command line replace those of the policy file
+    for name in LIST_OPTIONS:
+        if getattr(args, name) is None and name in policy_options:
+            setattr(args, name, policy_options[name])
+    # values of the policy file are not passed through the argparse types
+    for name, parse in BOUNDED_OPTIONS.items():
+        if getattr(args, name) is not None:
+            try:
+                parse(getattr(args, name))
+            except (argparse.ArgumentTypeError, TypeError, ValueError) as e:
+                parser.error(f"{name}: {e}")
     
     # assign args to RedactorConfig
     config = RedactorConfig(**vars(args))
 
+    # compile the redaction options once for all files
+    try:
+        policy = compile_policy(config)
+    except ValueError as e:
+        parser.error(str(e))
+
     # assign args to variables
     path = config.input
 
     # Validate the output flag
     validate_output_flag(config)
+
+    # detection results of repeated pages are shared across all files of the run
+    page_cache = PageCache(config.page_cache_size) if config.page_cache_size > 0 else None
     
+    # scan only, no redaction and no output files
+    if config.scan_only:
+        if is_directory(path):
+            print(f"\n[i] Scanning directory '{path}'\n")
+
+            # scanned files are journaled, so an interrupted triage can be resumed
+            journal_dir = os.path.dirname(os.path.abspath(config.scan_report)) if config.scan_report else path
+            journal = BatchJournal(config.journal or os.path.join(journal_dir, SCAN_JOURNAL_FILENAME))
+            files = discover_pdfs(path, config.recursive, config.include, config.exclude)
+            if config.resume:
+                files = journal.remaining(files)
+
+            # a file that cannot be scanned is reported and the triage continues
+            failed = 0
+            for file_path in files:
+                try:
+                    scan_pdf(file_path, policy, config.scan_report)
+                except Exception as e:
+                    failed += 1
+                    error = f"{type(e).__name__}: {e}"
+                    print(f"\n[Error] Could not scan '{file_path}' ({error})")
+                    if config.scan_report:
+                        write_scan_error(config.scan_report, file_path, error)
+                    continue
+                journal.record(file_path)
+            print(f"\n[i] Scanned {len(files)} file{'' if len(files)==1 else 's'}: {len(files) - failed} ok, {failed} failed")
+        else:
+            scan_pdf(path, policy, config.scan_report)
+
     # if path is a pdf file 
-    if not is_directory(path):
+    elif not is_directory(path):
         if config.text:
             print(f"\n[i] Using custom redaction text {config.text}")
-        # load pdf and ocr
-        pdf_document = load_pdf(path)
-        text_pages = ocr_pdf(pdf_document)
-        
-        # run redaction process
-        pdf_document = run_redaction(path, text_pages, pdf_document, config)
 
-        # save to file
-        if config.output:
-            out_path = config.output
-            save_redactions_to_relative_file(pdf_document, out_path)
-        else:
-            out_path = "{0}_{2}{1}".format(*os.path.splitext(path) + ("redacted",))
-            save_redactions_to_file(pdf_document, out_path)
+        # run redaction process and save to file
+        try:
+            if config.output:
+                process_file(path, config.output, policy, page_cache, profile_dir=config.profile)
+            else:
+                out_path = "{0}_{2}{1}".format(*os.path.splitext(path) + ("redacted",))
+                process_file(path, out_path, policy, page_cache, relative_to_script=True, profile_dir=config.profile)
+        except VerificationError as e:
+            print(f"\n[Error] Verification of '{e.file_path}' failed: {e}")
+            sys.exit(1)
+        except IncompleteScanError as e:
+            print(f"\n[Error] '{e.file_path}' was not fully scanned: {e}")
+            sys.exit(1)
+
+        if config.profile:
+            print(f"\n[i] Profile written to '{profile_path(config.profile, path)}.txt'")
 
 
     # if path is directory
@@ -706,27 +2377,49 @@ def main():
 
         if config.text:
             print(f"\n[i] Using custom redaction text {config.text}")
-        # Iterate over the pdf files in the directory
-        for filename in os.listdir(path):
-            if filename.lower().endswith('.pdf'):
-                file_path = os.path.join(path, filename)
 
-                # load pdf and ocr
-                pdf_document = load_pdf(file_path)
-                text_pages = ocr_pdf(pdf_document)
+        # completed files are journaled, so an interrupted run can be resumed
+        journal = BatchJournal(config.journal or os.path.join(config.output or path, JOURNAL_FILENAME))
+        files = discover_pdfs(path, config.recursive, config.include, config.exclude)
+        if config.resume:
+            files = journal.remaining(files)
 
-                # run redaction process
-                pdf_document = run_redaction(file_path, text_pages, pdf_document, config)
+        # the pdf files in the directory, largest first
+        tasks = [(file_path, redacted_file_path(file_path, path, config.output), not config.output) for file_path in files]
 
-                # save to file
-                if config.output:
-                    out_path =  os.path.join(config.output, "{0}_{2}{1}".format(*os.path.splitext(filename) + ("redacted",)))
-                    save_redactions_to_relative_file(pdf_document, out_path)
-                else:
-                    out_path = os.path.join(path, "{0}_{2}{1}".format(*os.path.splitext(filename) + ("redacted",)))
-                    save_redactions_to_file(pdf_document, out_path)
+        results = []
+
+        def on_result(result):
+            results.append(result)
+            if result["status"] == "ok":
+                journal.record(result["input"], result["output"])
+            else:
+                print(f"\n[Error] {result['status'].capitalize()}: '{result['input']}' ({result['error']})")
+                if config.quarantine:
+                    result["quarantined"] = quarantine_file(result["input"], path, config.quarantine)
+
+        # run redaction process and save to file, every file in an isolated worker unless previewing
+        inline_tasks = tasks
+        if not (config.preview or config.no_isolation):
+            try:
+                run_isolated_batch(tasks, policy, config.workers, config.timeout, config.memory_limit, config.page_cache_size, on_result, config.profile)
+                inline_tasks = []
+            except WorkerStartError as e:
+                print(f"\n[Warning] {e}, processing the remaining files without isolation.")
+                inline_tasks = unfinished_tasks(tasks, results)
+        if inline_tasks:
+            run_inline_batch(inline_tasks, policy, page_cache, on_result, config.profile)
+            if page_cache is not None:
+                print(f"\n[i] Page cache: {page_cache.hits} reused, {page_cache.misses} detected, {len(page_cache)} cached pages")
+
+        print_run_summary(results)
+        if config.report:
+            write_run_report(config.report, results)
+        if config.profile:
+            write_batch_profile(config.profile, files)
 
 
 # init main
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
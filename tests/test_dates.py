@@ -0,0 +1,95 @@
+import time
+
+import pytest
+
+from pdf_redactor import build_month_table, iter_dates_in_text, iter_times_in_text
+
+
+def dates(text, locales=None):
+    return list(iter_dates_in_text(text, build_month_table(locales)))
+
+
+def times(text):
+    return list(iter_times_in_text(text))
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Date: 10/5/2023", ["10/5/2023"]),
+    ("on 12.1.2000.", ["12.1.2000"]),
+    ("released 2023-05-10", ["2023-05-10"]),
+    ("due 10 Aug 2033", ["10 Aug 2033"]),
+    ("due Aug 10, 2033", ["Aug 10, 2033"]),
+    ("due 10th Aug 2033", ["10th Aug 2033"]),
+    ("am 7. Januar 2018", ["7. Januar 2018"]),
+    ("le 14 juillet 1789", ["14 juillet 1789"]),
+    ("el 3 de marzo de 2021", ["3 de marzo de 2021"]),
+    ("el 3 de marzo del 2021", ["3 de marzo del 2021"]),
+    ("US style 12/31/2020", ["12/31/2020"]),
+])
+def test_dates_are_found(text, expected):
+    assert dates(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "31.02.2020",          # February has no 31st
+    "29.02.2021",          # no leap year
+    "2023-13-01",          # no 13th month
+    "1.10.5.2023",         # part of a longer number chain
+    "10.5.2023.1",
+    "abc10.5.2023",
+    "10.5-2023",           # mixed separators
+    "3 de 2021",           # connector without month
+    "10 August",           # no year
+])
+def test_invalid_dates_are_rejected(text):
+    assert dates(text) == []
+
+
+def test_leap_day():
+    assert dates("29.02.2020 and 29.02.2000 but 29.02.1900") == ["29.02.2020", "29.02.2000"]
+
+
+def test_month_names_are_limited_to_locales():
+    assert dates("3 de marzo de 2021", locales=["en"]) == []
+    assert dates("7. Januar 2018", locales=["de"]) == ["7. Januar 2018"]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Meeting at 14:30", ["14:30"]),
+    ("at 9:15 am", ["9:15 am"]),
+    ("at 9:15 a.m.", ["9:15 a.m."]),
+    ("um 9:15 Uhr", ["9:15 Uhr"]),
+    ("at 08:15:30", ["08:15:30"]),
+    ("at 9:05:10", ["9:05:10"]),
+])
+def test_times_are_found(text, expected):
+    assert times(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "see John 3:16",       # verse reference
+    "Score 2:1",
+    "at 24:00",
+    "at 12:60",
+    "12:30:45:10",         # part of a longer colon chain
+])
+def test_non_times_are_rejected(text):
+    assert times(text) == []
+
+
+def test_pm_suffix_needs_a_12_hour_clock():
+    assert times("13:15 pm") == ["13:15"]
+
+
+def test_iso_timestamp_yields_date_and_time():
+    text = "created 2023-05-10T08:15"
+    assert dates(text) == ["2023-05-10"]
+    assert times(text) == ["08:15"]
+
+
+def test_detection_is_linear_on_number_chains():
+    chain = ".".join(str(n % 31 + 1) for n in range(100000))
+    start = time.perf_counter()
+    dates(chain)
+    times(":".join(str(n % 60).zfill(2) for n in range(100000)))
+    assert time.perf_counter() - start < 5
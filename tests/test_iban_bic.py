@@ -0,0 +1,77 @@
+import pytest
+
+from pdf_redactor import iter_ibans_in_text, validate_bic, validate_iban, find_bics
+
+
+def bics(text, registry=None, strict=False):
+    return find_bics([text], registry, strict=strict)[0]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("IBAN: DE89 3704 0044 0532 0130 00", ["DE89 3704 0044 0532 0130 00"]),
+    ("IBAN: DE89370400440532013000", ["DE89370400440532013000"]),
+    ("GB82WEST12345698765432 and NL91ABNA0417164300", ["GB82WEST12345698765432", "NL91ABNA0417164300"]),
+    ("DE89370400440532013000 DE89370400440532013000", ["DE89370400440532013000", "DE89370400440532013000"]),
+    ("lower case de89370400440532013000", ["de89370400440532013000"]),
+])
+def test_ibans_are_found(text, expected):
+    assert list(iter_ibans_in_text(text)) == expected
+
+
+@pytest.mark.parametrize("candidate", [
+    "DE89370400440532013001",   # checksum
+    "DE8937040044053201300",    # too short for DE
+    "XX89370400440532013000",   # unknown country
+    "GB82WEST1234569876543X",   # BBAN structure
+])
+def test_invalid_ibans_are_rejected(candidate):
+    assert validate_iban(candidate) is None
+
+
+def test_iban_running_into_next_word_is_cut():
+    assert list(iter_ibans_in_text("DE89 3704 0044 0532 0130 00 1234")) == ["DE89 3704 0044 0532 0130 00"]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("BIC: DEUTDEFF500", ["DEUTDEFF500"]),
+    ("SWIFT code COBADEFFXXX", ["COBADEFFXXX"]),
+    ("IBAN    BIC\nDE89370400440532013000    COBADEFFXXX", ["COBADEFFXXX"]),
+    ("Deutsche Bank AG, Frankfurt am Main, DEUTDEFFXXX", ["DEUTDEFFXXX"]),
+    ("Please transfer to MARKDEF1100 today", ["MARKDEF1100"]),
+])
+def test_bics_are_found(text, expected):
+    assert bics(text) == expected
+
+
+@pytest.mark.parametrize("bic", [
+    "DEUTXXFFXXX",  # country code
+    "DEUTDEFOXXX",  # O as second location character
+    "DEUTDEFFXAB",  # branch starting with X
+])
+def test_invalid_bics_are_rejected(bic):
+    assert not validate_bic(bic, "BIC: " + bic, 5)
+
+
+def test_upper_case_legal_text_has_no_bics():
+    text = (
+        "ARTICLE 4 TERMINATION\n"
+        "THE TENANT SHALL RETURN THE PROPERTY IN ITS ORIGINAL CONDITION. SECTIONS 2 AND 3 SURVIVE.\n"
+        "ALL ARTICLES AND EXHIBITS FORM PART OF THIS AGREEMENT.\n"
+    )
+    assert bics(text) == []
+
+
+def test_headings_in_mixed_case_text_are_no_bics():
+    text = "TERMINATION\nEither party may end this agreement.\nEXHIBITS\nSee the attached property list."
+    assert bics(text) == []
+
+
+def test_strict_mode_needs_label_or_iban():
+    assert bics("Frankfurt am Main, DEUTDEFFXXX", strict=True) == []
+    assert bics("SWIFT DEUTDEFFXXX", strict=True) == ["DEUTDEFFXXX"]
+    assert bics("DE89370400440532013000 / DEUTDEFFXXX", strict=True) == ["DEUTDEFFXXX"]
+
+
+def test_registry_decides_alone():
+    registry = frozenset({"DEUTDEFF"})
+    assert bics("TERMINATION DEUTDEFFXXX COBADEFFXXX", registry) == ["DEUTDEFFXXX"]
@@ -0,0 +1,44 @@
+import time
+
+import pytest
+
+import pdf_redactor
+from pdf_redactor import compile_masks, find_custom_mask, nested_quantifier
+
+
+@pytest.mark.parametrize("pattern, expected", [
+    (r"(\w+\s?)+x", True),
+    (r"(?:a*)*", True),
+    (r"(ab+){2,}", True),
+    (r"((a+)b)*", True),
+    (r"(a+)?", False),
+    (r"(ab)+c", False),
+    (r"a+b+", False),
+    (r"[(]+a+", False),
+    (r"\(a+\)+", False),
+    (r"(?:[)+]a)+", False),
+])
+def test_nested_quantifiers_are_detected(pattern, expected):
+    assert nested_quantifier(pattern) == expected
+
+
+def test_nested_quantifiers_are_rejected_without_regex_module(monkeypatch):
+    monkeypatch.setattr(pdf_redactor, "regex_module", None)
+    with pytest.raises(ValueError, match="regex"):
+        compile_masks([r"(\w+\s?)+x"], regex=True)
+    assert compile_masks([r"\d{3}-\d{4}"], regex=True).search("call 555-1234")
+
+
+def test_literal_masks_keep_punctuation():
+    assert compile_masks(["C++"]).findall("we use C++ and C") == ["C++"]
+
+
+def test_backtracking_mask_stops_at_budget():
+    pytest.importorskip("regex")
+    masks = [r"(?:(a|aa)+)+b"]
+    unscanned = {}
+    start = time.perf_counter()
+    hits = find_custom_mask(["x aaa " + "a" * 60], masks, regex=True, budget=0.5, unscanned=unscanned)
+    assert time.perf_counter() - start < 5
+    assert hits == {0: []}
+    assert unscanned == {0: [(0, 66)]}
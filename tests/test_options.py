@@ -0,0 +1,22 @@
+import argparse
+
+import pytest
+
+from pdf_redactor import RedactorConfig, at_least, run_isolated_batch
+
+
+def test_at_least_accepts_the_bound():
+    assert at_least(1)("1") == 1
+    assert at_least(0, float)("0") == 0.0
+
+
+@pytest.mark.parametrize("parse, value", [(at_least(1), "0"), (at_least(1), "-3"), (at_least(0, float), "-0.5")])
+def test_at_least_rejects_values_below_the_bound(parse, value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse(value)
+
+
+@pytest.mark.parametrize("workers, timeout", [(0, 10), (-1, 10), (1, -1)])
+def test_isolated_batch_rejects_invalid_limits(workers, timeout):
+    with pytest.raises(AssertionError):
+        run_isolated_batch([("a.pdf", "b.pdf", False)], RedactorConfig(), workers, timeout)
@@ -0,0 +1,46 @@
+import pymupdf as fitz
+
+from pdf_redactor import PageCache, RedactorConfig, compile_policy, page_fingerprint, run_redaction
+
+
+def document(x):
+    pdf_document = fitz.open()
+    page = pdf_document.new_page()
+    # the first line spans the whole text block, so the block stays the same when the name moves
+    page.insert_text((72, 100), "Customer reference number 1234567890 of the account")
+    page.insert_text((72, 114), "Name:")
+    page.insert_text((x, 114), "John Doe")
+    return pdf_document
+
+
+def test_fingerprint_depends_on_word_positions():
+    config = compile_policy(RedactorConfig(mask=["John Doe"]))
+    pages = [document(x).load_page(0) for x in (108, 112)]
+    texts = [page.get_text("text") for page in pages]
+    assert texts[0] == texts[1]
+    assert page_fingerprint(pages[0], texts[0], config) != page_fingerprint(pages[1], texts[1], config)
+
+
+def test_fingerprint_is_stable():
+    config = compile_policy(RedactorConfig(mask=["John Doe"]))
+    pages = [document(108).load_page(0) for _ in range(2)]
+    texts = [page.get_text("text") for page in pages]
+    assert page_fingerprint(pages[0], texts[0], config) == page_fingerprint(pages[1], texts[1], config)
+
+
+def test_cached_rects_are_not_reused_at_other_positions():
+    config = compile_policy(RedactorConfig(mask=["John Doe"]))
+    page_cache = PageCache(16)
+    for x in (108, 112):
+        pdf_document = run_redaction("test.pdf", None, document(x), config, page_cache)
+        assert "John Doe" not in pdf_document.load_page(0).get_text("text")
+    assert len(page_cache) == 2 and page_cache.hits == 0
+
+
+def test_repeated_page_is_reused():
+    config = compile_policy(RedactorConfig(mask=["John Doe"]))
+    page_cache = PageCache(16)
+    for _ in range(2):
+        pdf_document = run_redaction("test.pdf", None, document(108), config, page_cache)
+        assert "John Doe" not in pdf_document.load_page(0).get_text("text")
+    assert len(page_cache) == 1 and page_cache.hits == 1
@@ -0,0 +1,50 @@
+import random
+
+from pdf_redactor import PageRectIndex
+
+
+def merged(*rects):
+    index = PageRectIndex()
+    for rect in rects:
+        index.add(rect)
+    return [tuple(rect) for rect in index.rects()]
+
+
+def test_duplicates_are_merged():
+    assert merged((10, 10, 50, 20), (10, 10, 50, 20)) == [(10, 10, 50, 20)]
+
+
+def test_contained_rects_are_merged():
+    assert merged((10, 10, 50, 40), (20, 20, 30, 25)) == [(10, 10, 50, 40)]
+
+
+def test_touching_rects_on_a_line_are_merged():
+    assert merged((10, 10, 50, 20), (50.5, 11, 90, 21)) == [(10, 10, 90, 21)]
+
+
+def test_rects_on_other_lines_are_kept():
+    assert merged((10, 10, 50, 20), (10, 22, 50, 32)) == [(10, 10, 50, 20), (10, 22, 50, 32)]
+
+
+def test_distant_rects_on_a_line_are_kept():
+    assert merged((10, 10, 50, 20), (60, 10, 90, 20)) == [(10, 10, 50, 20), (60, 10, 90, 20)]
+
+
+def test_empty_rects_are_skipped():
+    assert merged((10, 10, 10, 20), (10, 10, 50, 10)) == []
+
+
+def test_merge_chains_across_grid_cells():
+    # the last rect bridges the first two, which are in different grid cells
+    assert merged((10, 10, 60, 20), (70, 10, 200, 20), (59, 10, 71, 20)) == [(10, 10, 200, 20)]
+
+
+def test_result_does_not_depend_on_insertion_order():
+    rng = random.Random(1)
+    rects = []
+    for _ in range(200):
+        x, line = rng.uniform(0, 500), rng.randrange(40)
+        rects.append((x, line * 15, x + rng.uniform(5, 60), line * 15 + 10))
+    expected = merged(*rects)
+    rng.shuffle(rects)
+    assert merged(*rects) == expected
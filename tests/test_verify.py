@@ -0,0 +1,54 @@
+import pymupdf as fitz
+import pytest
+
+import pdf_redactor
+from pdf_redactor import RedactorConfig, VerificationError, find_leftover_hashes, process_file, value_hash
+
+
+def leftovers(text, values):
+    hashes = {value_hash(value) for value in values}
+    return {h for h in hashes if h in find_leftover_hashes(text, hashes)}
+
+
+def test_leftover_values_are_found_case_and_whitespace_insensitive():
+    assert leftovers("Dear JOHN\n  doe, your invoice", ["John Doe"]) == {value_hash("John Doe")}
+
+
+def test_only_leftover_values_are_reported():
+    found = leftovers("Call (555) 123-4567 or write to x@y.com", ["(555) 123-4567", "Jane Roe", "x@y.com"])
+    assert found == {value_hash("(555) 123-4567"), value_hash("x@y.com")}
+
+
+def test_values_at_the_end_of_the_text_are_found():
+    assert leftovers("IBAN DE89370400440532013000", ["DE89370400440532013000"])
+
+
+def test_values_inside_words_are_not_reported():
+    # detectors only match on word boundaries, so windows only start at words and punctuation
+    assert leftovers("JohnDoeLtd", ["Doe"]) == set()
+    assert leftovers("", ["Doe"]) == set()
+
+
+def pdf_with(tmp_path, text):
+    pdf_document = fitz.open()
+    pdf_document.new_page().insert_text((72, 100), text)
+    path = str(tmp_path / "in.pdf")
+    pdf_document.save(path)
+    return path
+
+
+def test_redacted_output_is_verified(tmp_path):
+    out_path = str(tmp_path / "out.pdf")
+    saved_path = process_file(pdf_with(tmp_path, "Name: John Doe"), out_path, RedactorConfig(mask=["John Doe"], verify=True))
+    assert saved_path == out_path
+    assert "John Doe" not in fitz.open(out_path).load_page(0).get_text("text")
+
+
+def test_redactions_declined_in_preview_fail_verification(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_redactor, "preview_redactions", lambda page, annots: page.delete_annot(annots))
+    out_path = str(tmp_path / "out.pdf")
+    config = RedactorConfig(mask=["John Doe"], verify=True, preview=True)
+    with pytest.raises(VerificationError) as error:
+        process_file(pdf_with(tmp_path, "Name: John Doe"), out_path, config)
+    assert error.value.file_path == str(tmp_path / "out.unverified.pdf")
+    assert error.value.failures == {0: 1}